@@ -0,0 +1,73 @@
+"""Memory benchmark of the value classes of the alignment object model: bytes per object and peak RSS of a run.
+
+Run from the repository root: python -m benchmarks.memory_benchmark
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import resource
+import sys
+import tracemalloc
+from typing import Callable
+
+from src.alignment.alignment_position import AlignedPair, NotAlignedQueryPosition, ScoredAlignedPair
+from src.correlation.optical_map import PositionWithSiteId
+from src.correlation.peak import Peak
+from src.diagnostic.benchmark_alignment import BenchmarkAlignedPair, BenchmarkAlignmentPosition
+
+position = PositionWithSiteId(1, 1000.)
+pair = AlignedPair(position, position, 5., 1)
+benchmarkPosition = BenchmarkAlignmentPosition(1, 1000)
+
+factories = {
+    "PositionWithSiteId": lambda i: PositionWithSiteId(i, 1000.),
+    "AlignedPair": lambda i: AlignedPair(position, position, 5., i),
+    "ScoredAlignedPair": lambda i: ScoredAlignedPair(pair, i),
+    "NotAlignedQueryPosition": lambda i: NotAlignedQueryPosition(position, i),
+    "Peak": lambda i: Peak(i, 1., 0, 0, 1.),
+    "BenchmarkAlignedPair": lambda i: BenchmarkAlignedPair(benchmarkPosition, benchmarkPosition),
+}
+
+
+def bytesPerObject(factory: Callable[[int], object], count: int):
+    """Memory allocated for the objects themselves, excluding the list keeping them and the values they share."""
+    gc.collect()
+    tracemalloc.start()
+    objects = [None] * count
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(count):
+        objects[i] = factory(i)
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return allocated / count, hasattr(objects[0], "__dict__")
+
+
+def runSample(outputFile: str):
+    from src.program import main
+    sys.argv = [sys.argv[0],
+                "-r", "data/NA12878_BSPQI/alignmolvref_contig24_r.cmap",
+                "-q", "data/NA12878_BSPQI/alignmolvref_contig24_q.cmap",
+                "-o", outputFile, "-pb", "-oM", "all", "-e", "serial"]
+    main()
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=200_000, help="Number of objects of each class.")
+    parser.add_argument("-o", "--output", default="/tmp/memory_benchmark.xmap",
+                        help="Output file of the NA12878 sample run.")
+    parser.add_argument("--skipSample", action="store_true", help="Only measure bytes per object.")
+    args = parser.parse_args()
+
+    for name, factory in factories.items():
+        size, hasDict = bytesPerObject(factory, args.number)
+        print(f"{name:<26} {size:>8.1f} B/object {'with' if hasDict else 'without'} __dict__")
+
+    if not args.skipSample:
+        print(f"NA12878 sample peak RSS {runSample(args.output):>8.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
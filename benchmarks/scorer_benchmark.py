@@ -0,0 +1,54 @@
+"""Microbenchmark of AlignmentPositionScorer: scoring positions one by one versus the batch API.
+
+Run from the repository root: python -m benchmarks.scorer_benchmark
+"""
+from __future__ import annotations
+
+import argparse
+import timeit
+
+import numpy as np
+
+from src.alignment.aligner import AlignerEngine
+from src.alignment.alignment_position_scorer import AlignmentPositionScorer
+from src.correlation.optical_map import OpticalMap
+
+
+def createWindow(labels: int, seed: int):
+    random = np.random.default_rng(seed)
+    referencePositions = np.cumsum(random.integers(500, 20000, labels)).tolist()
+    queryPositions = [p - referencePositions[0] + random.integers(-300, 300) for p in referencePositions
+                      if random.random() > 0.1]
+    queryPositions = sorted(max(p, 0) for p in queryPositions)
+    reference = OpticalMap(1, referencePositions[-1] + 1, referencePositions)
+    query = OpticalMap(2, queryPositions[-1] + 1, queryPositions)
+    return AlignerEngine(1500).alignTable(reference, query, referencePositions[0], referencePositions[-1], False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-l", "--labels", type=int, default=2000, help="Number of reference labels in the window.")
+    parser.add_argument("-n", "--number", type=int, default=50, help="Number of runs of each variant.")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    scorer = AlignmentPositionScorer(1000, 1., -250)
+    table = createWindow(args.labels, args.seed)
+    positions = list(table)
+    assert np.array_equal(scorer.getScores(table), [p.score for p in scorer.getScoredPositions(positions)])
+
+    variants = {
+        "getScoredPositions (per position)": lambda: scorer.getScoredPositions(positions),
+        "getScores (positions)": lambda: scorer.getScores(positions),
+        "getScores (table)": lambda: scorer.getScores(table),
+    }
+    print(f"{len(table)} positions, {args.number} runs")
+    baseline = None
+    for name, variant in variants.items():
+        seconds = min(timeit.repeat(variant, number=args.number, repeat=3)) / args.number
+        baseline = baseline or seconds
+        print(f"{name:<36} {seconds * 1e6:>10.1f} us {baseline / seconds:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
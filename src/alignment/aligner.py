@@ -1,81 +1,76 @@
 from __future__ import annotations
 
 import itertools
-from itertools import dropwhile, takewhile, chain
-from typing import List, NamedTuple
+from typing import List
 
-from src.alignment.alignment_position import AlignedPair, NotAlignedQueryPosition, \
-    NotAlignedReferencePosition, NotAlignedPosition, AlignmentPosition
+import numpy as np
+
+from src.alignment.alignment_position import AlignmentPosition
 from src.alignment.alignment_position_scorer import AlignmentPositionScorer
 from src.alignment.alignment_results import AlignmentResultRow
-from src.alignment.segment_with_resolved_conflicts import AlignmentSegmentConflictResolver
+from src.alignment.alignment_table import AlignmentTable
+from src.alignment.segment_with_resolved_conflicts import AlignmentSegmentConflictResolver, \
+    AlignmentSegmentsWithResolvedConflicts
 from src.alignment.segments_factory import AlignmentSegmentsFactory
-from src.correlation.optical_map import OpticalMap, PositionWithSiteId
+from src.correlation.optical_map import OpticalMap
 from src.correlation.peak import Peak
-
-
-class _ReferenceIndexWithDistance(NamedTuple):
-    index: int
-    distance: int
-    queryShift: int
-
-    @staticmethod
-    def withQueryAfterReference(index: int, distance: int):
-        return _ReferenceIndexWithDistance(index, distance, distance)
-
-    @staticmethod
-    def withQueryBeforeReference(index: int, distance: int):
-        return _ReferenceIndexWithDistance(index, distance, -distance)
+from src.execution.deadline import Deadline
 
 
 class AlignerEngine:
     def __init__(self, maxDistance: int):
         self.maxDistance = maxDistance
-        self.iteration = 1
+        self.iterations = itertools.count(1)
 
     def align(self, reference: OpticalMap, query: OpticalMap, referenceStartPosition: int, referenceEndPosition: int,
               isReverse: bool) -> List[AlignmentPosition]:
-        referencePositions = self.__getReferencePositionsWithinRange(reference, referenceStartPosition,
-                                                                     referenceEndPosition)
-        queryPositions = list(query.getPositionsWithSiteIds(isReverse))
-        alignedPairs = self.__getAlignedPairs(referencePositions, queryPositions, referenceStartPosition)
-        deduplicatedAlignedPairs = list(AlignedPair.deduplicate(alignedPairs))
-        notAlignedPositions = self.__getNotAlignedPositions(queryPositions, referencePositions,
-                                                            deduplicatedAlignedPairs, referenceStartPosition)
-        return sorted(chain(deduplicatedAlignedPairs, notAlignedPositions))
-
-    def __getReferencePositionsWithinRange(self, reference: OpticalMap, referenceStartPosition: int,
-                                           referenceEndPosition: int):
-        return list(takewhile(lambda x: x.position <= referenceEndPosition + self.maxDistance, dropwhile(
-            lambda x: x.position < referenceStartPosition - self.maxDistance,
-            reference.getPositionsWithSiteIds())))
-
-    def __getAlignedPairs(self, referencePositions: List[PositionWithSiteId],
-                          queryPositions: List[PositionWithSiteId], referenceStartPosition: int):
-        for referencePosition in referencePositions:
-            referencePositionAdjustedToQuery = referencePosition.position - referenceStartPosition
-            queryPositionsWithinDistance = takewhile(
-                lambda x: x.position <= referencePositionAdjustedToQuery + self.maxDistance, dropwhile(
-                    lambda x: x.position < referencePositionAdjustedToQuery - self.maxDistance,
-                    queryPositions))
-            for queryPosition in queryPositionsWithinDistance:
-                yield AlignedPair(referencePosition, queryPosition,
-                                  queryPosition.position - referencePositionAdjustedToQuery, self.iteration)
-        self.iteration += 1
+        return list(self.alignTable(reference, query, referenceStartPosition, referenceEndPosition, isReverse))
+
+    def alignTable(self, reference: OpticalMap, query: OpticalMap, referenceStartPosition: int,
+                   referenceEndPosition: int, isReverse: bool) -> AlignmentTable:
+        start, end = self.getReferenceWindow(reference, referenceStartPosition, referenceEndPosition)
+        referenceSiteIds, referencePositions = reference.siteIds[start:end], reference.positions[start:end]
+        querySiteIds, queryPositions = query.getSiteIdsAndPositions(isReverse)
+        referenceIndices, queryIndices, queryShifts = self.__getAlignedPairs(referencePositions, queryPositions,
+                                                                             referenceStartPosition)
+        pairs = self.__deduplicate(self.__deduplicate(np.arange(len(queryIndices)), querySiteIds[queryIndices],
+                                                      queryShifts), referenceSiteIds[referenceIndices], queryShifts)
+        return AlignmentTable.create(referenceSiteIds, referencePositions, querySiteIds, queryPositions,
+                                     referenceIndices[pairs], queryIndices[pairs], queryShifts[pairs],
+                                     referenceStartPosition, self.nextIteration())
+
+    def nextIteration(self) -> int:
+        """Number identifying the next alignment table, unique for this engine."""
+        return next(self.iterations)
+
+    def getReferenceWindow(self, reference: OpticalMap, referenceStartPosition: int, referenceEndPosition: int):
+        start = int(reference.positions.searchsorted(referenceStartPosition - self.maxDistance, "left"))
+        end = start + int(reference.positions[start:].searchsorted(referenceEndPosition + self.maxDistance, "right"))
+        return start, end
+
+    def __getAlignedPairs(self, referencePositions: np.ndarray, queryPositions: np.ndarray,
+                          referenceStartPosition: int):
+        """Pairs every reference position with all query positions within maxDistance, in order of reference and
+        then query positions.
+        """
+        referencePositionsAdjustedToQuery = referencePositions - referenceStartPosition
+        starts = np.searchsorted(queryPositions, referencePositionsAdjustedToQuery - self.maxDistance, "left")
+        ends = np.searchsorted(queryPositions, referencePositionsAdjustedToQuery + self.maxDistance, "right")
+        counts = ends - starts
+        referenceIndices = np.repeat(np.arange(len(referencePositions)), counts)
+        queryIndices = np.arange(counts.sum()) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        queryShifts = queryPositions[queryIndices] - referencePositionsAdjustedToQuery[referenceIndices]
+        return referenceIndices, queryIndices, queryShifts
 
     @staticmethod
-    def __getNotAlignedPositions(queryPositions: List[PositionWithSiteId],
-                                 referencePositions: List[PositionWithSiteId],
-                                 alignedPairs: List[AlignedPair],
-                                 referenceStartPosition: int):
-        alignedReferenceSiteIds = [p.reference.siteId for p in alignedPairs]
-        alignedQuerySiteIds = [p.query.siteId for p in alignedPairs]
-        notAlignedReferencePositions: List[NotAlignedPosition] = \
-            [NotAlignedReferencePosition(r) for r in referencePositions if
-             r.siteId not in alignedReferenceSiteIds]
-        notAlignedQueryPositions = [NotAlignedQueryPosition(q, referenceStartPosition) for q in queryPositions if
-                                    q.siteId not in alignedQuerySiteIds]
-        return notAlignedReferencePositions + notAlignedQueryPositions
+    def __deduplicate(pairs: np.ndarray, siteIds: np.ndarray, queryShifts: np.ndarray):
+        """Keeps the closest of the pairs for each site id, the first one of equally close pairs, ordered by site id.
+        """
+        order = pairs[np.lexsort((np.arange(len(pairs)), np.abs(queryShifts[pairs]), siteIds[pairs]))]
+        sortedSiteIds = siteIds[order]
+        firstOfSiteId = np.ones(len(order), dtype=bool)
+        firstOfSiteId[1:] = sortedSiteIds[1:] != sortedSiteIds[:-1]
+        return order[firstOfSiteId]
 
 
 class Aligner:
@@ -89,23 +84,34 @@ class Aligner:
         self.segmentConflictResolver = segmentConflictResolver
 
     def align(self, reference: OpticalMap, query: OpticalMap, peaks: Peak | List[Peak],
-              isReverse: bool = False) -> AlignmentResultRow:
+              isReverse: bool = False, deadline: Deadline = None) -> AlignmentResultRow:
+        """When the deadline passes, the remaining peaks are skipped and, instead of resolving conflicts between
+        segments, only the best segment is kept. Such result is marked as degraded.
+        """
         if isinstance(peaks, Peak):
             peaks = [peaks]
-        segments = list(itertools.chain.from_iterable(
-            [self.getSegments(isReverse, p, query, reference) for p in peaks]))
-
-        return AlignmentResultRow.create(self.segmentConflictResolver.resolveConflicts(segments),
+        deadline = deadline or Deadline()
+        segmentsOfPeaks, allPeaksAligned = deadline.map(lambda p: self.getSegments(isReverse, p, query, reference),
+                                                        peaks)
+        segments = list(itertools.chain.from_iterable(segmentsOfPeaks))
+
+        if deadline.passed():
+            resolvedSegments = AlignmentSegmentsWithResolvedConflicts(
+                sorted(segments, key=lambda s: s.segmentScore, reverse=True)[:1])
+        else:
+            resolvedSegments = self.segmentConflictResolver.resolveConflicts(segments)
+
+        return AlignmentResultRow.create(resolvedSegments,
                                          query.moleculeId,
                                          reference.moleculeId,
                                          query.length,
                                          reference.length,
-                                         isReverse)
+                                         isReverse,
+                                         not allPeaksAligned or deadline.passed())
 
     def getSegments(self, isReverse: bool, peak: Peak, query: OpticalMap, reference: OpticalMap):
         referenceStartPosition = peak.position
         referenceEndPosition = peak.position + query.length
-        alignmentPositions = self.alignmentEngine.align(reference, query, referenceStartPosition,
-                                                        referenceEndPosition, isReverse)
-        scoredPositions = self.scorer.getScoredPositions(alignmentPositions)
-        return self.segmentsFactory.getSegments(scoredPositions, peak)
+        alignmentTable = self.alignmentEngine.alignTable(reference, query, referenceStartPosition,
+                                                         referenceEndPosition, isReverse)
+        return self.segmentsFactory.getSegments(self.scorer.getScoredTable(alignmentTable), peak)
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import itertools
 from abc import ABC, abstractmethod
 from typing import Tuple, Iterable, Callable, Sized
 
@@ -8,6 +7,8 @@ from src.correlation.optical_map import PositionWithSiteId
 
 
 class AlignmentPosition(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def getScoredPosition(self, perfectMatchScore: int, distancePenaltyMultiplier: float,
                           unmatchedPenalty: int) -> ScoredAlignmentPosition:
@@ -21,8 +22,14 @@ class AlignmentPosition(ABC):
     def __lt__(self, other: AlignmentPosition):
         return self.absolutePosition < other.absolutePosition
 
+    @staticmethod
+    def absolutePositionSelector(position: AlignmentPosition):
+        return position.absolutePosition
+
 
 class NotAlignedPosition(AlignmentPosition, ABC):
+    __slots__ = ()
+
     def getScoredPosition(self, perfectMatchScore: int, distancePenaltyMultiplier: float,
                           unmatchedPenalty: int) -> ScoredAlignmentPosition:
         if unmatchedPenalty > 0:
@@ -39,6 +46,8 @@ class NotAlignedPosition(AlignmentPosition, ABC):
 
 
 class NotAlignedQueryPosition(NotAlignedPosition):
+    __slots__ = ("query", "referenceStart")
+
     def __init__(self, query: PositionWithSiteId, referenceStart: int):
         self.query = query
         self.referenceStart = referenceStart
@@ -63,6 +72,8 @@ class NotAlignedQueryPosition(NotAlignedPosition):
 
 
 class NotAlignedReferencePosition(NotAlignedPosition):
+    __slots__ = ("reference",)
+
     def __init__(self, reference: PositionWithSiteId):
         self.reference = reference
 
@@ -86,6 +97,7 @@ class NotAlignedReferencePosition(NotAlignedPosition):
 
 
 class AlignedPair(AlignmentPosition):
+    __slots__ = ("reference", "query", "queryShift", "source")
     null: AlignedPair
 
     def __init__(self, reference: PositionWithSiteId, query: PositionWithSiteId, queryShift: int = 0, source: int = 0):
@@ -118,9 +130,14 @@ class AlignedPair(AlignmentPosition):
 
     @staticmethod
     def __deduplicateByKey(pairs: Iterable[AlignedPair], key: Callable[[AlignedPair], int]):
-        sortedPairs = sorted(pairs, key=key)
-        for _, ambiguousPairs in itertools.groupby(sortedPairs, key):
-            yield min(ambiguousPairs, key=AlignedPair.distanceSelector)
+        """Keeps the closest pair for each key, the first one of equally close pairs, ordered by the key."""
+        closestPairs = {}
+        for pair in pairs:
+            pairKey = key(pair)
+            closestPair = closestPairs.get(pairKey)
+            if closestPair is None or pair.distance < closestPair.distance:
+                closestPairs[pairKey] = pair
+        return [closestPairs[k] for k in sorted(closestPairs)]
 
     @property
     def distance(self):
@@ -158,6 +175,8 @@ class AlignedPair(AlignmentPosition):
 
 
 class _NullAlignedPair(AlignedPair):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(PositionWithSiteId(0, 0), PositionWithSiteId(0, 0))
 
@@ -172,10 +191,13 @@ AlignedPair.null = _NullAlignedPair()
 
 
 class ScoredAlignmentPosition(AlignmentPosition, ABC):
+    __slots__ = ()
     score: float
 
 
 class ScoredAlignedPair(AlignedPair, ScoredAlignmentPosition):
+    __slots__ = ("score",)
+
     def __init__(self, pair: AlignedPair, score: float):
         super().__init__(pair.reference, pair.query, pair.queryShift, pair.source)
         self.score = score
@@ -185,6 +207,8 @@ class ScoredAlignedPair(AlignedPair, ScoredAlignmentPosition):
 
 
 class ScoredNotAlignedPosition(NotAlignedPosition, ScoredAlignmentPosition):
+    __slots__ = ("score", "position")
+
     @property
     def absolutePosition(self) -> int:
         return self.position.absolutePosition
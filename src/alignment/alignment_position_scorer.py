@@ -1,6 +1,9 @@
-from typing import List
+from typing import List, Sequence
 
-from src.alignment.alignment_position import AlignmentPosition
+import numpy as np
+
+from src.alignment.alignment_position import AlignmentPosition, AlignedPair
+from src.alignment.alignment_table import AlignmentTable, AlignmentPositionKind
 
 
 class AlignmentPositionScorer:
@@ -14,3 +17,22 @@ class AlignmentPositionScorer:
     def getScoredPositions(self, positions: List[AlignmentPosition]):
         return [p.getScoredPosition(self.perfectMatchScore, self.distancePenaltyMultiplier, self.unmatchedPenalty) for p
                 in positions]
+
+    def getScoredTable(self, table: AlignmentTable) -> AlignmentTable:
+        return table.withScores(self.getScores(table))
+
+    def getScores(self, positions: Sequence[AlignmentPosition]) -> np.ndarray:
+        """Scores of all positions computed at once, in the order of the positions."""
+        if isinstance(positions, AlignmentTable):
+            aligned = positions.kinds == AlignmentPositionKind.ALIGNED_PAIR
+            queryShifts = positions.queryShifts
+        else:
+            aligned = np.fromiter((isinstance(p, AlignedPair) for p in positions), dtype=bool, count=len(positions))
+            queryShifts = np.fromiter((p.queryShift if isinstance(p, AlignedPair) else 0. for p in positions),
+                                      dtype=float, count=len(positions))
+        if self.unmatchedPenalty > 0 and not aligned.all():
+            raise ValueError("penalty should be negative")
+        return np.where(aligned, self.getAlignedPairScores(queryShifts), self.unmatchedPenalty)
+
+    def getAlignedPairScores(self, queryShifts: np.ndarray) -> np.ndarray:
+        return self.perfectMatchScore - self.distancePenaltyMultiplier * np.abs(queryShifts)
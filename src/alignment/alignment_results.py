@@ -2,8 +2,11 @@ from __future__ import annotations
 
 import itertools
 from dataclasses import dataclass
+from functools import cached_property
 from enum import Enum
-from typing import List
+from typing import List, Dict
+
+import numpy as np
 
 from src.alignment.alignment_position import AlignedPair, NotAlignedPosition
 from src.alignment.segment_with_resolved_conflicts import AlignmentSegmentsWithResolvedConflicts
@@ -71,7 +74,8 @@ class AlignmentResultRow(BenchmarkAlignment):
                referenceId: int,
                queryLength: int,
                referenceLength: int,
-               reverseStrand: bool):
+               reverseStrand: bool,
+               degraded: bool = False):
         segments = segmentsWithoutConflicts.segments
         alignedPairs = sorted(p for s in segments for p in s.positions if isinstance(p, AlignedPair))
         firstPair = alignedPairs[0] if alignedPairs else AlignedPair.null
@@ -81,9 +85,12 @@ class AlignmentResultRow(BenchmarkAlignment):
         referenceStartPosition = firstPair.reference.position
         referenceEndPosition = lastPair.reference.position
         confidence = sum(s.segmentScore for s in segments)
+        queryStartSiteId = (firstPair if not reverseStrand else lastPair).query.siteId
+        queryEndSiteId = (lastPair if not reverseStrand else firstPair).query.siteId
         return AlignmentResultRow(segments, queryId, referenceId, queryLength, referenceLength, queryStartPosition,
                                   queryEndPosition, referenceStartPosition, referenceEndPosition, reverseStrand,
-                                  confidence)
+                                  confidence, degraded=degraded, queryStartSiteId=queryStartSiteId,
+                                  queryEndSiteId=queryEndSiteId)
 
     def __init__(self,
                  segments: List[AlignmentSegment],
@@ -97,7 +104,10 @@ class AlignmentResultRow(BenchmarkAlignment):
                  referenceEndPosition: int = 0,
                  reverseStrand: bool = False,
                  confidence: float = 0.,
-                 alignedRest: bool = False):
+                 alignedRest: bool = False,
+                 degraded: bool = False,
+                 queryStartSiteId: int = None,
+                 queryEndSiteId: int = None):
 
         self.queryId = queryId
         self.referenceId = referenceId
@@ -111,25 +121,57 @@ class AlignmentResultRow(BenchmarkAlignment):
         self.referenceLength = referenceLength
         self.segments = segments
         self.alignedRest = alignedRest
+        self.degraded = degraded
+        self.queryStartSiteId = queryStartSiteId
+        self.queryEndSiteId = queryEndSiteId
+
+    # Views derived from segments are computed on first access and kept, segments of a row are not changed.
 
-    @property
+    @cached_property
     def positions(self):
         return [position for segment in self.segments for position in segment.positions]
 
-    @property
+    @cached_property
     def alignedPairs(self) -> List[AlignedPair]:
         return [p for p in self.positions if isinstance(p, AlignedPair)]
 
-    @property
+    @cached_property
     def notAlignedPositions(self) -> List[NotAlignedPosition]:
         return [p for p in self.positions if isinstance(p, NotAlignedPosition)]
 
-    @property
+    @cached_property
     def cigarString(self):
         if not self.alignedPairs:
             return ""
-        hitEnums = list(self.__getHitEnums())
-        return "".join(self.__aggregateHitEnums(hitEnums))
+        referenceSiteIds = np.array([p.reference.siteId for p in self.alignedPairs])
+        querySiteIds = np.array([p.query.siteId for p in self.alignedPairs])
+        lastOfSameQuerySiteId = np.append(querySiteIds[1:] != querySiteIds[:-1], True)
+        referenceSteps = np.diff(referenceSiteIds[lastOfSameQuerySiteId])
+        if np.any(referenceSteps <= 0):
+            hitEnums = list(self.__getHitEnums())
+            return "".join(self.__aggregateHitEnums(hitEnums))
+        return self.__encodeHits(referenceSteps, np.abs(np.diff(querySiteIds[lastOfSameQuerySiteId])))
+
+    @staticmethod
+    def __encodeHits(referenceSteps: np.ndarray, querySteps: np.ndarray):
+        """Run-length encoded hits of pairs with increasing reference site ids, which are the first match followed,
+        for each next pair, by insertions of skipped query sites, deletions of skipped reference sites and a match.
+        Pairs with reference site ids out of order are encoded by walking the reference sites one by one.
+        """
+        hitValues = [HitEnum.INSERTION.value, HitEnum.DELETION.value, HitEnum.MATCH.value]
+        counts = np.concatenate([[1], np.column_stack(
+            [np.maximum(querySteps - 1, 0), referenceSteps - 1, np.ones_like(referenceSteps)]).ravel()])
+        hits = np.concatenate([[2], np.tile([0, 1, 2], len(referenceSteps))])
+        hits, counts = hits[counts > 0], counts[counts > 0]
+        if counts.sum() == 1:
+            return ""  # the single match of a single pair is not encoded by the hit walk either
+        runStarts = np.flatnonzero(np.append(True, hits[1:] != hits[:-1]))
+        return "".join(f"{count}{hitValues[hit]}"
+                       for count, hit in zip(np.add.reduceat(counts, runStarts).tolist(), hits[runStarts].tolist()))
+
+    @cached_property
+    def alignmentString(self):
+        return "".join([f"({pair.reference.siteId},{pair.query.siteId})" for pair in self.alignedPairs])
 
     def __getHitEnums(self):
         pairs = list(self.__removeDuplicateQueryPositionsPreservingLastOne(self.alignedPairs))
@@ -176,44 +218,39 @@ class AlignmentResultRow(BenchmarkAlignment):
         x = f"{count}{hit.value}"
         return x
 
-    def getUnalignedFragments(self, queries: List[OpticalMap]) -> List[OpticalMap]:
+    def getUnalignedFragments(self, queries: Dict[int, OpticalMap]) -> List[OpticalMap]:
         """Function used to return unaligned fragments of the query
         if those parts constitute more than 0.2 of the whole query
 
-        :param queries: whole query which is being currently aligned
-        :type queries: List[OpticalMap]
+        :param queries: queries by their molecule ids, including the query which is being currently aligned
+        :type queries: Dict[int, OpticalMap]
         :return: Unaligned parts of query in question
         :rtype: List[OpticalMap]
         """
         if abs(self.queryStartPosition - self.queryEndPosition) > 0.8 * self.queryLength:
             return []
         else:
-            query = next((opticMap for opticMap in queries if opticMap.moleculeId == self.queryId), None)
+            query = queries.get(self.queryId)
+            queryStartSiteId, queryEndSiteId = self.__getQueryStartAndEndSiteIds(query)
             if self.queryStartPosition == 0.0 or self.queryEndPosition == 0.0:
                 # Aligned positions are at the end/start
                 if self.orientation == '+':
-                    positions = query.positions[query.positions.index(self.queryEndPosition) - 2:]
+                    positions = query.positions[queryEndSiteId - 3:]
                     shift = len(query.positions) - len(positions)
                     if self.queryEndPosition == 0.0:
                         return []
                 else:
-                    alignedPairs = sorted(p for s in self.segments for p in s.positions if isinstance(p, AlignedPair))
-                    lastPair = alignedPairs[-1] if alignedPairs else AlignedPair.null
-                    positions = query.positions[: lastPair.query.siteId + 3]
+                    positions = query.positions[: queryStartSiteId + 3]
                     shift = 0
                 return [OpticalMap(self.queryId, self.queryLength, positions, shift=shift)]
             else:
                 # Case where aligned fragment is in the middle
                 if self.orientation == '+':
-                    positions1 = query.positions[: query.positions.index(self.queryStartPosition) + 3]
-                    positions2 = query.positions[query.positions.index(self.queryEndPosition) - 2:]
-
+                    positions1 = query.positions[: queryStartSiteId + 2]
+                    positions2 = query.positions[queryEndSiteId - 3:]
                 else:
-                    alignedPairs = sorted(p for s in self.segments for p in s.positions if isinstance(p, AlignedPair))
-                    firstPair = alignedPairs[0] if alignedPairs else AlignedPair.null
-                    lastPair = alignedPairs[-1] if alignedPairs else AlignedPair.null
-                    positions1 = query.positions[: lastPair.query.siteId + 3]
-                    positions2 = query.positions[firstPair.query.siteId - 2:]
+                    positions1 = query.positions[: queryStartSiteId + 3]
+                    positions2 = query.positions[queryEndSiteId - 2:]
 
                 if len(positions1) >= 7 and len(positions2) >= 7:
                     return [OpticalMap(self.queryId, self.queryLength, positions1, shift=0),
@@ -227,10 +264,27 @@ class AlignmentResultRow(BenchmarkAlignment):
                 else:
                     return []
 
+    def __getQueryStartAndEndSiteIds(self, query: OpticalMap):
+        """Site ids of the query start and end, which rows not created from segments search for by position."""
+        if self.queryStartSiteId is not None:
+            return self.queryStartSiteId, self.queryEndSiteId
+        if self.orientation == '+':
+            positions = query.positions.tolist()
+            return tuple(positions.index(p) + 1 if p in positions else None
+                         for p in (self.queryStartPosition, self.queryEndPosition))
+        alignedPairs = sorted(self.alignedPairs)
+        firstPair = alignedPairs[0] if alignedPairs else AlignedPair.null
+        lastPair = alignedPairs[-1] if alignedPairs else AlignedPair.null
+        return lastPair.query.siteId, firstPair.query.siteId
+
     def setAlignedRest(self, alignedRest: bool):
         self.alignedRest = alignedRest
         return self
 
+    def setDegraded(self, degraded: bool):
+        self.degraded = degraded
+        return self
+
     def check_overlap(self, alignedRest: AlignmentResultRow, maxDifference: int) -> bool:
         """Function used to identify overlapping alignments of the same query
 
@@ -267,5 +321,5 @@ class AlignmentResultRow(BenchmarkAlignment):
             notEmptySegments = [s for s in [seg1, seg2] if s != AlignmentSegment.empty]
             return AlignmentResultRow.create(AlignmentSegmentsWithResolvedConflicts(notEmptySegments),
                                              self.queryId, self.referenceId, self.queryLength, self.referenceLength,
-                                             self.reverseStrand)
+                                             self.reverseStrand, self.degraded or alignedRest.degraded)
         return
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from enum import IntEnum
+from typing import List, Sequence, overload
+
+import numpy as np
+
+from src.alignment.alignment_position import AlignmentPosition, AlignedPair, NotAlignedReferencePosition, \
+    NotAlignedQueryPosition, ScoredAlignedPair, ScoredNotAlignedPosition
+from src.correlation.optical_map import PositionWithSiteId
+
+
+class AlignmentPositionKind(IntEnum):
+    ALIGNED_PAIR = 0
+    NOT_ALIGNED_REFERENCE = 1
+    NOT_ALIGNED_QUERY = 2
+
+
+class AlignmentTable(Sequence[AlignmentPosition]):
+    """Alignment positions of a single peak kept as columns, sorted by absolute position. Site ids and positions
+    which do not apply to a kind of position are 0.
+
+    As a sequence it yields AlignedPair, NotAlignedReferencePosition and NotAlignedQueryPosition objects, or their
+    scored counterparts once scores are set. They are created on first access and then kept, so repeated access
+    returns the same objects.
+    """
+
+    def __init__(self,
+                 kinds: np.ndarray,
+                 referenceSiteIds: np.ndarray,
+                 referencePositions: np.ndarray,
+                 querySiteIds: np.ndarray,
+                 queryPositions: np.ndarray,
+                 queryShifts: np.ndarray,
+                 referenceStart: float,
+                 source: int = 0,
+                 scores: np.ndarray = None):
+        self.kinds = kinds
+        self.referenceSiteIds = referenceSiteIds
+        self.referencePositions = referencePositions
+        self.querySiteIds = querySiteIds
+        self.queryPositions = queryPositions
+        self.queryShifts = queryShifts
+        self.referenceStart = referenceStart
+        self.source = source
+        self.scores = scores
+        self.__views: List[AlignmentPosition | None] = [None] * len(kinds)
+        self.__rows = None
+
+    @staticmethod
+    def create(referenceSiteIds: np.ndarray, referencePositions: np.ndarray, querySiteIds: np.ndarray,
+               queryPositions: np.ndarray, alignedReferenceIndices: np.ndarray, alignedQueryIndices: np.ndarray,
+               queryShifts: np.ndarray, referenceStart: float, source: int = 0) -> AlignmentTable:
+        """Creates the table of aligned pairs given by indices of their reference and query positions, followed by
+        not aligned reference positions and not aligned query positions, stable sorted by absolute position.
+        """
+        notAlignedReference = np.ones(len(referenceSiteIds), dtype=bool)
+        notAlignedReference[alignedReferenceIndices] = False
+        notAlignedQuery = np.ones(len(querySiteIds), dtype=bool)
+        notAlignedQuery[alignedQueryIndices] = False
+        pairsCount = len(alignedReferenceIndices)
+        notAlignedReferenceCount = np.count_nonzero(notAlignedReference)
+        notAlignedQueryCount = np.count_nonzero(notAlignedQuery)
+
+        kinds = np.repeat([AlignmentPositionKind.ALIGNED_PAIR, AlignmentPositionKind.NOT_ALIGNED_REFERENCE,
+                           AlignmentPositionKind.NOT_ALIGNED_QUERY],
+                          [pairsCount, notAlignedReferenceCount, notAlignedQueryCount]).astype(np.int8)
+        referenceFill = np.zeros(notAlignedQueryCount, dtype=referencePositions.dtype)
+        queryFill = np.zeros(notAlignedReferenceCount, dtype=queryPositions.dtype)
+        tableReferenceSiteIds = np.concatenate([referenceSiteIds[alignedReferenceIndices],
+                                                referenceSiteIds[notAlignedReference],
+                                                np.zeros(notAlignedQueryCount, dtype=referenceSiteIds.dtype)])
+        tableReferencePositions = np.concatenate([referencePositions[alignedReferenceIndices],
+                                                  referencePositions[notAlignedReference], referenceFill])
+        tableQuerySiteIds = np.concatenate([querySiteIds[alignedQueryIndices],
+                                            np.zeros(notAlignedReferenceCount, dtype=querySiteIds.dtype),
+                                            querySiteIds[notAlignedQuery]])
+        tableQueryPositions = np.concatenate([queryPositions[alignedQueryIndices], queryFill,
+                                              queryPositions[notAlignedQuery]])
+        tableQueryShifts = np.concatenate([queryShifts, np.zeros(notAlignedReferenceCount + notAlignedQueryCount,
+                                                                 dtype=queryShifts.dtype)])
+        absolutePositions = np.concatenate([tableReferencePositions[:pairsCount + notAlignedReferenceCount],
+                                            queryPositions[notAlignedQuery] + referenceStart])
+        order = np.argsort(absolutePositions, kind="stable")
+        return AlignmentTable(kinds[order], tableReferenceSiteIds[order], tableReferencePositions[order],
+                              tableQuerySiteIds[order], tableQueryPositions[order], tableQueryShifts[order],
+                              referenceStart, source)
+
+    def withScores(self, scores: np.ndarray) -> AlignmentTable:
+        return AlignmentTable(self.kinds, self.referenceSiteIds, self.referencePositions, self.querySiteIds,
+                              self.queryPositions, self.queryShifts, self.referenceStart, self.source, scores)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    @overload
+    def __getitem__(self, index: int) -> AlignmentPosition:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[AlignmentPosition]:
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        view = self.__views[index]
+        if view is None:
+            view = self.__views[index] = self.__createView(index)
+        return view
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __eq__(self, other):
+        return isinstance(other, Sequence) and list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __createView(self, index: int) -> AlignmentPosition:
+        if self.__rows is None:
+            columns = [self.kinds, self.referenceSiteIds, self.referencePositions, self.querySiteIds,
+                       self.queryPositions, self.queryShifts]
+            self.__rows = list(zip(*[c.tolist() for c in columns],
+                                   self.scores.tolist() if self.scores is not None else [None] * len(self)))
+        kind, referenceSiteId, referencePosition, querySiteId, queryPosition, queryShift, score = self.__rows[index]
+        if kind == AlignmentPositionKind.ALIGNED_PAIR:
+            pair = AlignedPair(PositionWithSiteId(referenceSiteId, referencePosition),
+                               PositionWithSiteId(querySiteId, queryPosition), queryShift, self.source)
+            return pair if score is None else ScoredAlignedPair(pair, score)
+        if kind == AlignmentPositionKind.NOT_ALIGNED_REFERENCE:
+            position = NotAlignedReferencePosition(PositionWithSiteId(referenceSiteId, referencePosition))
+        else:
+            position = NotAlignedQueryPosition(PositionWithSiteId(querySiteId, queryPosition), self.referenceStart)
+        return position if score is None else ScoredNotAlignedPosition(position, score)
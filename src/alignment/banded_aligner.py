@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+
+from src.alignment.aligner import AlignerEngine
+from src.alignment.alignment_position_scorer import AlignmentPositionScorer
+from src.alignment.alignment_results import AlignmentResultRow
+from src.alignment.alignment_table import AlignmentTable
+from src.alignment.segment_with_resolved_conflicts import AlignmentSegmentsWithResolvedConflicts
+from src.alignment.segments import AlignmentSegment, EmptyAlignmentSegment
+from src.correlation.optical_map import OpticalMap
+from src.correlation.peak import Peak
+from src.execution.deadline import Deadline
+
+
+class BandedAligner:
+    """Alternative to Aligner, which aligns the query at each peak by dynamic programming over label sites instead
+    of building segments and resolving conflicts between them. It finds the best scoring chain of aligned pairs
+    increasing on both sequences, where pairs are scored by AlignmentPositionScorer and every reference and query site
+    skipped between consecutive pairs of the chain is scored as not aligned.
+
+    Only pairs within maxDistance of the diagonal given by the peak are considered, so the cost is proportional to
+    the number of reference sites times the width of that band. The best chain of all peaks is the only segment of the
+    alignment.
+    """
+
+    def __init__(self, scorer: AlignmentPositionScorer, alignmentEngine: AlignerEngine, minScore: float):
+        self.scorer = scorer
+        self.alignmentEngine = alignmentEngine
+        self.minScore = minScore
+
+    def align(self, reference: OpticalMap, query: OpticalMap, peaks: Peak | List[Peak],
+              isReverse: bool = False, deadline: Deadline = None) -> AlignmentResultRow:
+        """When the deadline passes, the remaining peaks are skipped and the result is marked as degraded."""
+        if isinstance(peaks, Peak):
+            peaks = [peaks]
+        deadline = deadline or Deadline()
+        segments, allPeaksAligned = deadline.map(lambda p: self.getSegment(isReverse, p, query, reference), peaks)
+        bestSegments = [max(segments, key=lambda s: s.segmentScore)] if segments else []
+        return AlignmentResultRow.create(AlignmentSegmentsWithResolvedConflicts(bestSegments),
+                                         query.moleculeId,
+                                         reference.moleculeId,
+                                         query.length,
+                                         reference.length,
+                                         isReverse,
+                                         not allPeaksAligned)
+
+    def getSegment(self, isReverse: bool, peak: Peak, query: OpticalMap, reference: OpticalMap) -> AlignmentSegment:
+        start, end = self.alignmentEngine.getReferenceWindow(reference, peak.position, peak.position + query.length)
+        referenceSiteIds, referencePositions = reference.siteIds[start:end], reference.positions[start:end]
+        querySiteIds, queryPositions = query.getSiteIdsAndPositions(isReverse)
+        referenceIndices, queryIndices, queryShifts = self.__getBestChain(referencePositions - peak.position,
+                                                                          queryPositions)
+        if not referenceIndices.size:
+            return EmptyAlignmentSegment(peak)
+
+        referenceStart, referenceEnd = referenceIndices[0], referenceIndices[-1] + 1
+        queryStart, queryEnd = queryIndices[0], queryIndices[-1] + 1
+        table = self.scorer.getScoredTable(AlignmentTable.create(
+            referenceSiteIds[referenceStart:referenceEnd], referencePositions[referenceStart:referenceEnd],
+            querySiteIds[queryStart:queryEnd], queryPositions[queryStart:queryEnd],
+            referenceIndices - referenceStart, queryIndices - queryStart, queryShifts, peak.position,
+            self.alignmentEngine.nextIteration()))
+        segment = AlignmentSegment.create(table[:], peak, table, range(len(table)))
+        return segment if segment.segmentScore >= self.minScore else EmptyAlignmentSegment(peak, table)
+
+    def __getBestChain(self, referencePositionsAdjustedToQuery: np.ndarray, queryPositions: np.ndarray):
+        """Sweeps reference sites one by one, each with the band of query sites within maxDistance, which are
+        contiguous and do not move back from one reference site to the next.
+
+        Score of a chain ending with a pair (i, j) of reference and query site indices is the score of the pair plus
+        the best of the scores of chains ending with any pair (k, l) where k < i and l < j, decreased by the penalty
+        for i + j - k - l - 2 skipped sites, if that is positive. Written as score(k, l) - penalty * (k + l), the best
+        predecessor is a prefix maximum over both indices. It is kept for the band columns of the last reference site
+        only, because bands never move back and the maximum does not change past the end of the band.
+        """
+        maxDistance = self.alignmentEngine.maxDistance
+        penalty = self.scorer.unmatchedPenalty
+        bandStarts = np.searchsorted(queryPositions, referencePositionsAdjustedToQuery - maxDistance, "left")
+        bandEnds = np.searchsorted(queryPositions, referencePositionsAdjustedToQuery + maxDistance, "right")
+
+        prefixStart = -1
+        prefixMaxima = np.array([-np.inf])
+        prefixMaximaCells = np.array([-1])
+        scores, predecessors, referenceIndices, queryIndices, queryShifts = [], [], [], [], []
+        cellsCount = 0
+        for i in np.flatnonzero(bandEnds > bandStarts):
+            bandStart, bandEnd = bandStarts[i], bandEnds[i]
+            columns = np.arange(bandStart, bandEnd)
+            shifts = queryPositions[bandStart:bandEnd] - referencePositionsAdjustedToQuery[i]
+
+            predecessorColumns = np.minimum(columns - 1 - prefixStart, len(prefixMaxima) - 1)
+            chainedScores = penalty * (i + columns - 2) + prefixMaxima[predecessorColumns]
+            chained = chainedScores > 0
+            rowScores = self.scorer.getAlignedPairScores(shifts) + np.where(chained, chainedScores, 0.)
+            scores.append(rowScores)
+            predecessors.append(np.where(chained, prefixMaximaCells[predecessorColumns], -1))
+            referenceIndices.append(np.full(len(columns), i))
+            queryIndices.append(columns)
+            queryShifts.append(shifts)
+
+            rowMaxima = np.maximum.accumulate(np.concatenate([[-np.inf], rowScores - penalty * (i + columns)]))
+            isNewMaximum = np.concatenate([[False], rowMaxima[1:] > rowMaxima[:-1]])
+            rowMaximaCells = np.concatenate([[-1], cellsCount + np.arange(len(columns))])[
+                np.maximum.accumulate(np.where(isNewMaximum, np.arange(len(rowMaxima)), 0))]
+            previousColumns = np.minimum(np.arange(bandStart - 1, bandEnd) - prefixStart, len(prefixMaxima) - 1)
+            better = rowMaxima > prefixMaxima[previousColumns]
+            prefixMaxima = np.where(better, rowMaxima, prefixMaxima[previousColumns])
+            prefixMaximaCells = np.where(better, rowMaximaCells, prefixMaximaCells[previousColumns])
+            prefixStart = bandStart - 1
+            cellsCount += len(columns)
+
+        if not cellsCount:
+            return np.array([], dtype=int), np.array([], dtype=int), np.array([])
+
+        scores = np.concatenate(scores)
+        predecessors = np.concatenate(predecessors)
+        chain = []
+        cell = int(np.argmax(scores))
+        while cell != -1:
+            chain.append(cell)
+            cell = predecessors[cell]
+        chain = chain[::-1]
+        return np.concatenate(referenceIndices)[chain], np.concatenate(queryIndices)[chain], \
+            np.concatenate(queryShifts)[chain]
@@ -1,14 +1,25 @@
 from __future__ import annotations
 
 import math
-from typing import Iterable, List
+from typing import Iterable, List, NamedTuple
+
+import numpy as np
 
 from src.alignment.segments import AlignmentSegment
 
 
 class SegmentChainer:
-    def __init__(self, sequentialityScorer: SequentialityScorer):
+    """Chains segments by dynamic programming over segments ordered by their positions. Predecessors of a segment
+    are looked up among segments sorted by reference end, so that segments ending after the current segment, which
+    cannot precede it, are skipped, and scores of the remaining predecessors are evaluated at once.
+
+    Optional band limits the reference distance between consecutive segments of a chain. Without it, chains are the
+    same as found by comparing all pairs of segments.
+    """
+
+    def __init__(self, sequentialityScorer: SequentialityScorer, band: float = None):
         self.sequentialityScorer = sequentialityScorer
+        self.band = band
 
     def chain(self, segments: Iterable[AlignmentSegment]):
         def initialOrderingKey(segment: AlignmentSegment):
@@ -20,17 +31,21 @@ class SegmentChainer:
         if not preOrderedNonEmptySegments:
             return emptySegments
 
-        cumulatedScore = [-math.inf] * len(preOrderedNonEmptySegments)
+        endpoints = SegmentsEndpoints.create(preOrderedNonEmptySegments)
+        orderByReferenceEnd = np.argsort(endpoints.referenceEnds, kind="stable")
+        sortedReferenceEnds = endpoints.referenceEnds[orderByReferenceEnd]
+        cumulatedScore = np.zeros(len(preOrderedNonEmptySegments))
         previousSegmentIndexes: List[int | None] = [None] * len(preOrderedNonEmptySegments)
         bestPreviousSegmentIndex = 0
         for i, currentSegment in enumerate(preOrderedNonEmptySegments):
-            cumulatedScore[i] = 0
-            for j, previousSegment in enumerate(preOrderedNonEmptySegments[:i]):
-                currentScore = cumulatedScore[j] + self.sequentialityScorer.getScore(
-                    previousSegment, currentSegment)
-                if currentScore > cumulatedScore[i]:
-                    cumulatedScore[i] = currentScore
-                    previousSegmentIndexes[i] = j
+            candidates = self.__getPredecessorCandidates(i, endpoints, orderByReferenceEnd, sortedReferenceEnds)
+            if candidates.size:
+                scores = cumulatedScore[candidates] + self.sequentialityScorer.getScores(
+                    endpoints.select(candidates), currentSegment)
+                best = int(np.argmax(scores))
+                if scores[best] > 0:
+                    cumulatedScore[i] = scores[best]
+                    previousSegmentIndexes[i] = int(candidates[best])
             cumulatedScore[i] += currentSegment.segmentScore
             if cumulatedScore[i] > cumulatedScore[bestPreviousSegmentIndex]:
                 bestPreviousSegmentIndex = i
@@ -39,6 +54,36 @@ class SegmentChainer:
             result.insert(0, preOrderedNonEmptySegments[bestPreviousSegmentIndex])
         return result + emptySegments
 
+    def __getPredecessorCandidates(self, index: int, endpoints: SegmentsEndpoints, orderByReferenceEnd: np.ndarray,
+                                   sortedReferenceEnds: np.ndarray):
+        """Indices of segments preceding the segment in the initial order, which do not end after it on the reference
+        (such predecessors always score -inf) and which end within the band, in ascending order, so that the first
+        of equally scored predecessors is chosen.
+        """
+        end = np.searchsorted(sortedReferenceEnds, endpoints.referenceEnds[index], side="right")
+        start = 0 if self.band is None \
+            else np.searchsorted(sortedReferenceEnds, endpoints.referenceStarts[index] - self.band, side="left")
+        candidates = orderByReferenceEnd[start:end]
+        return np.sort(candidates[candidates < index])
+
+
+class SegmentsEndpoints(NamedTuple):
+    referenceStarts: np.ndarray
+    referenceEnds: np.ndarray
+    queryStarts: np.ndarray
+    queryEnds: np.ndarray
+
+    @staticmethod
+    def create(segments: List[AlignmentSegment]):
+        return SegmentsEndpoints(
+            np.array([s.startPosition.reference.position for s in segments], dtype=float),
+            np.array([s.endPosition.reference.position for s in segments], dtype=float),
+            np.array([s.startPosition.query.position for s in segments], dtype=float),
+            np.array([s.endPosition.query.position for s in segments], dtype=float))
+
+    def select(self, indices: np.ndarray):
+        return SegmentsEndpoints(*(column[indices] for column in self))
+
 
 class SequentialityScorer:
     def __init__(self, segmentJoinMultiplier: float, sequentialityScore: int):
@@ -65,8 +110,32 @@ class SequentialityScorer:
             absDistSum = abs(referDist) + abs(queryDist)
             distDiff = referDist - queryDist
             if seqScore == 0:
-                return (distSum ** 2 + distDiff ** 2) / max(abs(distSum), abs(distDiff), 1)
+                return (distSum * distSum + distDiff * distDiff) / max(abs(distSum), abs(distDiff), 1)
             else:
-                return (absDistSum ** 2 + distDiff ** 2) / max(absDistSum + abs(distDiff), 1)
+                return (absDistSum * absDistSum + distDiff * distDiff) / max(absDistSum + abs(distDiff), 1)
 
         return - self.segmentJoinMultiplier * calcScore(referenceDistance, queryDistance, self.sequentialityScore)
+
+    def getScores(self, previousSegments: SegmentsEndpoints, currentSegment: AlignmentSegment) -> np.ndarray:
+        """Scores of all previous segments followed by the current segment, equal to scores given by getScore."""
+        currentQueryStart = currentSegment.startPosition.query.position
+        currentReferenceStart = currentSegment.startPosition.reference.position
+        queryLength = np.minimum(abs(currentSegment.endPosition.query.position - currentQueryStart),
+                                 np.abs(previousSegments.queryEnds - previousSegments.queryStarts))
+        referenceDistance = currentReferenceStart - previousSegments.referenceEnds
+        referenceLength = np.minimum(currentSegment.endPosition.reference.position - currentReferenceStart,
+                                     previousSegments.referenceEnds - previousSegments.referenceStarts)
+        queryDistance = previousSegments.queryEnds - currentQueryStart if currentSegment.reverse \
+            else currentQueryStart - previousSegments.queryEnds
+
+        distDiff = referenceDistance - queryDistance
+        if self.sequentialityScore == 0:
+            distSum = referenceDistance + queryDistance
+            score = (distSum * distSum + distDiff * distDiff) / \
+                np.maximum(np.maximum(np.abs(distSum), np.abs(distDiff)), 1)
+        else:
+            absDistSum = np.abs(referenceDistance) + np.abs(queryDistance)
+            score = (absDistSum * absDistSum + distDiff * distDiff) / np.maximum(absDistSum + np.abs(distDiff), 1)
+
+        feasible = np.minimum(referenceLength + 2 * referenceDistance, queryLength + 2 * queryDistance) >= 0
+        return np.where(feasible, - self.segmentJoinMultiplier * score, -math.inf)
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import itertools
 from abc import ABC, abstractmethod
 from typing import List, Tuple
 
@@ -12,11 +11,16 @@ from src.correlation.peak import Peak
 
 
 class AlignmentSegment:
+    """Contiguous part of the alignment positions of a peak. Segments which know the range of their positions within
+    all peak positions are subtracted from each other by range arithmetic, other segments by comparing positions.
+    """
+
     @staticmethod
     def create(positions: List[ScoredAlignmentPosition],
                peak: Peak,
-               allPeakPositions: List[ScoredAlignmentPosition]):
-        return AlignmentSegment(positions, sum(p.score for p in positions), peak, allPeakPositions) \
+               allPeakPositions: List[ScoredAlignmentPosition],
+               positionsRange: range = None):
+        return AlignmentSegment(positions, sum(p.score for p in positions), peak, allPeakPositions, positionsRange) \
             if positions \
             else EmptyAlignmentSegment(peak, allPeakPositions)
 
@@ -25,12 +29,14 @@ class AlignmentSegment:
             positions: List[ScoredAlignmentPosition],
             segmentScore: float,
             peak: Peak,
-            allPeakPositions: List[ScoredAlignmentPosition]):
+            allPeakPositions: List[ScoredAlignmentPosition],
+            positionsRange: range = None):
         self.positions = positions
         self.segmentScore = segmentScore
         self.alignedPositions = [p for p in positions if isinstance(p, ScoredAlignedPair)]
         self.peak = peak
         self.allPeakPositions = allPeakPositions or []
+        self.positionsRange = positionsRange
 
     @property
     def empty(self):
@@ -59,14 +65,19 @@ class AlignmentSegment:
                self.endPosition.lessOrEqualOnAnySequence(other.endPosition)
 
     def slice(self, start: AlignedPair, end: AlignedPair) -> AlignmentSegment:
-        slicedAtStart = itertools.dropwhile(
-            lambda p: p.lessOnBothSequences(start), self.positions)
-        positions = list(
-            itertools.takewhile(
-                lambda p: not isinstance(p, AlignedPair) or p.lessOrEqualOnAnySequence(end),
-                slicedAtStart))
-        self.__trimNotAlignedPositionsFromEnd(positions, end)
-        return AlignmentSegment.create(positions, self.peak, self.allPeakPositions)
+        sliceStart = next((i for i, p in enumerate(self.positions) if not p.lessOnBothSequences(start)),
+                          len(self.positions))
+        sliceEnd = next((i for i in range(sliceStart, len(self.positions))
+                         if isinstance(self.positions[i], AlignedPair)
+                         and not self.positions[i].lessOrEqualOnAnySequence(end)), len(self.positions))
+        while sliceEnd > sliceStart and not isinstance(self.positions[sliceEnd - 1], AlignedPair) and (
+                not end or not self.positions[sliceEnd - 1].lessOrEqualOnAnySequence(end)):
+            sliceEnd -= 1
+        return self.subsegment(sliceStart, sliceEnd)
+
+    def subsegment(self, start: int, end: int | None) -> AlignmentSegment:
+        return AlignmentSegment.create(self.positions[start:end], self.peak, self.allPeakPositions,
+                                       self.positionsRange[start:end] if self.positionsRange is not None else None)
 
     def getReferenceLabels(self) -> _ConflictingSegmentCharacteristics:
         """Function used to get all of the reference labels,
@@ -119,13 +130,6 @@ class AlignmentSegment:
                 sumScore += position.score
         return _ConflictingSegmentCharacteristics(queryPositions, queryScores, queryIndexes)
 
-    @staticmethod
-    def __trimNotAlignedPositionsFromEnd(positions, end=None):
-        if positions:
-            while not isinstance(positions[-1], AlignedPair) and (
-                    not end or not positions[-1].lessOrEqualOnAnySequence(end)):
-                positions.pop()
-
     def __eq__(self, other):
         return isinstance(other, AlignmentSegment) \
                and other.segmentScore == self.segmentScore \
@@ -134,12 +138,32 @@ class AlignmentSegment:
 
     def __sub__(self, other: AlignmentSegment | List[ScoredAlignmentPosition]):
         if isinstance(other, AlignmentSegment):
+            if (remainder := self.__subtractRange(other)) is not None:
+                return remainder
             otherPositions = other.positions
         else:
             otherPositions = other
         positions = [p for p in self.positions if p not in otherPositions]
         return AlignmentSegment.create(positions, self.peak, self.allPeakPositions)
 
+    def __subtractRange(self, other: AlignmentSegment) -> AlignmentSegment | None:
+        """Subtracts a range of positions of the same peak, unless it would split this segment in two."""
+        if other.empty:
+            return self.subsegment(0, len(self.positions))
+        if self.positionsRange is None or other.positionsRange is None \
+                or self.allPeakPositions is not other.allPeakPositions:
+            return None
+        length = len(self.positionsRange)
+        overlapStart = max(other.positionsRange.start - self.positionsRange.start, 0)
+        overlapEnd = min(other.positionsRange.stop - self.positionsRange.start, length)
+        if overlapStart >= overlapEnd:
+            return self.subsegment(0, length)
+        if overlapStart == 0:
+            return self.subsegment(overlapEnd, length)
+        if overlapEnd == length:
+            return self.subsegment(0, overlapStart)
+        return None
+
     def __repr__(self):
         return f"score: {self.segmentScore}, positions: {self.positions}"
 
@@ -221,11 +245,11 @@ class _SegmentPairWithConflict(_SegmentPair):
                 return self.leftSegment, self.rightSegment - self.rightConflictingSubsegment
             else:
                 leftTrimIndex = leftSubsegmentCharacteristics.indexes[optimalMergeIndex]
-                leftSegmentPositionsToRemove = self.leftConflictingSubsegment.positions[leftTrimIndex:]
+                leftSegmentPositionsToRemove = self.leftConflictingSubsegment.subsegment(leftTrimIndex, None)
                 newLeftSegment = self.leftSegment - leftSegmentPositionsToRemove
 
                 rightTrimIndex = rightSubsegmentCharacteristics.indexes[optimalMergeIndex]
-                rightSegmentPositionsToRemove = self.rightConflictingSubsegment.positions[:rightTrimIndex]
+                rightSegmentPositionsToRemove = self.rightConflictingSubsegment.subsegment(0, rightTrimIndex)
                 newRightSegment = self.rightSegment - rightSegmentPositionsToRemove
             return newLeftSegment, newRightSegment
         else:
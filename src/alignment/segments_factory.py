@@ -1,6 +1,7 @@
-from typing import List
+from typing import List, Sequence
 
 from src.alignment.alignment_position import ScoredAlignmentPosition
+from src.alignment.alignment_table import AlignmentTable
 from src.alignment.segments import AlignmentSegment, EmptyAlignmentSegment
 from src.correlation.peak import Peak
 
@@ -14,7 +15,7 @@ class AlignmentSegmentsFactory:
         self.minScore = minScore
         self.breakSegmentThreshold = breakSegmentThreshold
 
-    def getSegments(self, positions: List[ScoredAlignmentPosition], peak: Peak) -> List[AlignmentSegment]:
+    def getSegments(self, positions: Sequence[ScoredAlignmentPosition], peak: Peak) -> List[AlignmentSegment]:
         return _AlignmentSegmentBuilder(
             self.minScore,
             self.breakSegmentThreshold,
@@ -23,25 +24,34 @@ class AlignmentSegmentsFactory:
 
 
 class _AlignmentSegmentBuilder:
+    """Tracks the current segment by its start and end index and its score, so that the segment is created only
+    once it is added to the result. The score of the current segment is the running sum of the extended segment
+    at the moment it was accepted, which equals the sum of its positions' scores.
+    """
+
     def __init__(self,
                  minScore: float,
                  breakSegmentThreshold: float,
-                 positions: List[ScoredAlignmentPosition],
+                 positions: Sequence[ScoredAlignmentPosition],
                  peak: Peak):
         self.minScore = minScore
         self.breakSegmentThreshold = breakSegmentThreshold
         self.positions = positions
+        self.scores = positions.scores.tolist() if isinstance(positions, AlignmentTable) \
+            else [p.score for p in positions]
         self.peak = peak
         self.currentSegmentStart = 0
         self.extendedSegmentEndPosition = 0
         self.extendedSegmentScore = 0
-        self.currentSegment = EmptyAlignmentSegment(peak, positions)
+        self.acceptedSegmentStart = 0
+        self.acceptedSegmentEnd = 0
+        self.acceptedSegmentScore = 0.
         self.resultSegments = []
 
     def getSegments(self) -> List[AlignmentSegment]:
         alignmentEnd = len(self.positions) - 1
         while self.extendedSegmentEndPosition <= alignmentEnd:
-            self.extendedSegmentScore += self.positions[self.extendedSegmentEndPosition].score
+            self.extendedSegmentScore += self.scores[self.extendedSegmentEndPosition]
             if self.__extendedSegmentScoreFellBelowBreakSegmentThreshold():
                 self.__breakSegment()
             else:
@@ -53,7 +63,7 @@ class _AlignmentSegmentBuilder:
         return self.resultSegments or [EmptyAlignmentSegment(self.peak, self.positions)]
 
     def __extendedSegmentScoreFellBelowBreakSegmentThreshold(self):
-        return self.extendedSegmentScore <= max(0., self.currentSegment.segmentScore - self.breakSegmentThreshold)
+        return self.extendedSegmentScore <= max(0., self.acceptedSegmentScore - self.breakSegmentThreshold)
 
     def __breakSegment(self):
         self.__addCurrentSegmentToResultIfScoreIsEnough()
@@ -61,13 +71,17 @@ class _AlignmentSegmentBuilder:
         self.extendedSegmentScore = 0
 
     def __addCurrentSegmentToResultIfScoreIsEnough(self):
-        if self.currentSegment.segmentScore >= self.minScore:
-            self.resultSegments.append(self.currentSegment)
-            self.currentSegment = EmptyAlignmentSegment(self.peak, self.positions)
+        if self.acceptedSegmentScore >= self.minScore:
+            self.resultSegments.append(AlignmentSegment.create(
+                self.positions[self.acceptedSegmentStart:self.acceptedSegmentEnd],
+                self.peak,
+                self.positions,
+                range(self.acceptedSegmentStart, self.acceptedSegmentEnd)))
+            self.acceptedSegmentStart = self.acceptedSegmentEnd = 0
+            self.acceptedSegmentScore = 0.
 
     def __acceptExtendedSegmentIfScoreIsImproved(self):
-        if self.extendedSegmentScore > self.currentSegment.segmentScore:
-            self.currentSegment = AlignmentSegment.create(
-                self.positions[self.currentSegmentStart:self.extendedSegmentEndPosition],
-                self.peak,
-                self.positions)
+        if self.extendedSegmentScore > self.acceptedSegmentScore:
+            self.acceptedSegmentStart = self.currentSegmentStart
+            self.acceptedSegmentEnd = self.extendedSegmentEndPosition
+            self.acceptedSegmentScore = self.extendedSegmentScore
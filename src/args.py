@@ -30,9 +30,19 @@ class Args(NamedTuple):
     benchmarkAlignmentFile: TextIO
     peaksCount: int
     disableProgressBar: bool
+    cmapCache: bool
     outputMode: Literal["best", "separate", "joined", "all", "single"]
     segmentJoinMultiplier: float
     sequentialityScore: int
+    chainBand: int | None
+    alignEngine: Literal["segments", "dp"]
+    secondPassMode: Literal["local", "full"]
+    reusePrimaryPeaks: bool
+    queryTimeBudget: float | None
+    executor: Literal["process", "thread", "serial"]
+    pipelineWorkers: List[int] | None
+    pipelineProcessStages: List[Literal["seed", "refine", "align"]]
+    pipelineStatistics: bool
 
     @staticmethod
     def parse(args: List[str] = None) -> Args:
@@ -52,7 +62,8 @@ class Args(NamedTuple):
 
         parser.add_argument("-o", "--output", dest="outputFile", nargs="?", type=argparse.FileType("w"),
                             default=sys.stdout,
-                            help="XMAP output file path. Stdout is used if omitted.")
+                            help="XMAP output file path. Stdout is used if omitted. The file is gzip compressed if its "
+                                 "name ends with .gz.")
 
         parser.add_argument("-oM", "--outputMode", dest="outputMode", type=str,
                             default="best", choices=["best", "separate", "joined", "all"],
@@ -141,11 +152,73 @@ class Args(NamedTuple):
         parser.add_argument("-pb", "--disableProgressBar", dest="disableProgressBar", action="store_true",
                             help="Disables the progress bar.")
 
+        parser.add_argument("-cc", "--cmapCache", dest="cmapCache", action="store_true",
+                            help="Keeps parsed reference and query maps in a binary cache next to each CMAP file and "
+                                 "loads them from it in later runs, as long as the CMAP file is not modified.")
+
         parser.add_argument("-sj", "--segmentJoinMultiplier", dest="segmentJoinMultiplier", type=float, default=1,
                             help="Multiplier applied to segment sequentiality scores.")
 
         parser.add_argument("-ss", "--sequentialityScore", dest="sequentialityScore", type=int, default=0,
                             help="Segment sequentiality scoring function version.")
 
+        parser.add_argument("-cb", "--chainBand", dest="chainBand", type=int, default=None,
+                            help="Maximal reference distance between consecutive segments joined into a chain. "
+                                 "No limit if omitted.")
+
+        parser.add_argument("-ae", "--alignEngine", dest="alignEngine", type=str, default="segments",
+                            choices=["segments", "dp"],
+                            help="Method of aligning the query at the peaks of its correlation with the reference. "
+                                 "'segments' - aligned pairs are split into segments, which are then chained, "
+                                 "'dp' - the best chain of aligned pairs is found by banded dynamic programming, "
+                                 "with pairs scored the same way.")
+
+        parser.add_argument("-sm", "--secondPassMode", dest="secondPassMode", type=str, default="full",
+                            choices=["local", "full"],
+                            help="Search space of the second pass, which aligns unaligned fragments of queries. "
+                                 "'full' - each fragment is correlated with all references in both orientations, "
+                                 "'local' - each fragment is correlated only with the reference window around "
+                                 "the first pass alignment of its query, in the same orientation, which is where "
+                                 "joinable alignments lie (see 'maxDifference'). 'local' is faster, but changes "
+                                 "results in every output mode. A fragment is aligned within that window even if "
+                                 "it aligns better elsewhere, so usually more fragments are joined, with other "
+                                 "scores, and second pass alignments elsewhere are not found.")
+
+        parser.add_argument("-rp", "--reusePrimaryPeaks", dest="reusePrimaryPeaks", action="store_true",
+                            help="Second pass skips the initial cross-correlation seeding of unaligned fragments and "
+                                 "refines the peaks found for the whole query in the first pass instead, "
+                                 "limited to the second pass search space (see 'secondPassMode').")
+
+        parser.add_argument("-tb", "--queryTimeBudget", dest="queryTimeBudget", type=float, default=None,
+                            help="Time in seconds after which alignment of a single query falls back to a cheaper "
+                                 "path: remaining peaks are skipped and only the best alignment segment is kept "
+                                 "instead of resolving conflicts between segments. Such alignments are marked in "
+                                 "the 'Degraded' column of the output and the degraded queries are listed at the end. "
+                                 "No limit if omitted.")
+
+        parser.add_argument("-e", "--executor", dest="executor", type=str, default="process",
+                            choices=["process", "thread", "serial"],
+                            help="How queries are aligned in parallel: 'process' - in worker processes, "
+                                 "'thread' - in worker threads sharing the reference maps without serialization, "
+                                 "which suits runs dominated by cross-correlation, 'serial' - one by one in the main "
+                                 "process. The number of workers is set by 'cpus'. Not used with 'pipelineWorkers'.")
+
+        parser.add_argument("-pw", "--pipelineWorkers", dest="pipelineWorkers", type=int, nargs=3, default=None,
+                            metavar=("SEED", "REFINE", "ALIGN"),
+                            help="Runs the alignment as a pipeline of three stages: initial cross-correlation "
+                                 "seeding, second cross-correlation refinement and alignment, each with the given "
+                                 "number of workers and connected by bounded queues. Each query is processed by a "
+                                 "single worker from start to end if omitted, see 'cpus'.")
+
+        parser.add_argument("-pp", "--pipelineProcessStages", dest="pipelineProcessStages", type=str, nargs="*",
+                            default=["align"], choices=["seed", "refine", "align"],
+                            help="Pipeline stages which run in worker processes, the remaining stages run in threads, "
+                                 "which suits cross-correlation that does not hold the GIL. Used with "
+                                 "'pipelineWorkers'.")
+
+        parser.add_argument("-ps", "--pipelineStatistics", dest="pipelineStatistics", action="store_true",
+                            help="Reports utilisation of the pipeline stages to stderr after each pass. Used with "
+                                 "'pipelineWorkers'.")
+
         args = parser.parse_args(args)
         return args  # type: ignore
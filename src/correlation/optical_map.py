@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import warnings
 from dataclasses import dataclass
+from functools import cached_property
 from math import ceil
-from typing import List
+from typing import List, Tuple
 
 import numpy as np
 from scipy.signal import find_peaks, correlate
@@ -16,52 +17,93 @@ warnings.simplefilter("ignore")
 
 @dataclass(frozen=True)
 class PositionWithSiteId:
+    __slots__ = ("siteId", "position")
     siteId: int
     position: int
 
     def __lt__(self, other: PositionWithSiteId):
         return self.position < other.position
 
+    def __reduce__(self):
+        return PositionWithSiteId, (self.siteId, self.position)
+
 
 def toRelativeGenomicPositions(correlationCoordinates: np.ndarray, resolution: int, start: int = 0) -> np.ndarray:
     resolutionAdjustment = ceil(resolution / 2) - 1
     return correlationCoordinates * resolution + (resolutionAdjustment + start)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class OpticalMap:
+    """Label positions are kept as a read-only float array, sorted ascending. Site ids and positions on the reverse
+    strand are derived from it once and shared by all callers.
+    """
     moleculeId: int
     length: int
-    positions: List[int]
+    positions: np.ndarray
     shift: int = 0
 
+    def __post_init__(self):
+        positions = np.asarray(self.positions, dtype=float).view()
+        positions.flags.writeable = False
+        object.__setattr__(self, "positions", positions)
+
+    def __eq__(self, other):
+        return isinstance(other, OpticalMap) \
+            and (self.moleculeId, self.length, self.shift) == (other.moleculeId, other.length, other.shift) \
+            and np.array_equal(self.positions, other.positions)
+
+    def __hash__(self):
+        return hash((self.moleculeId, self.length, self.shift, len(self.positions)))
+
+    @cached_property
+    def siteIds(self) -> np.ndarray:
+        siteIds = np.arange(1, len(self.positions) + 1) + self.shift
+        siteIds.flags.writeable = False
+        return siteIds
+
+    @cached_property
+    def reverseStrandPositions(self) -> np.ndarray:
+        """Positions counted from the end of the molecule, so ascending as well, with site ids in reverseSiteIds."""
+        positions = (self.length - 1) - self.positions[::-1]
+        positions.flags.writeable = False
+        return positions
+
+    @property
+    def reverseSiteIds(self) -> np.ndarray:
+        return self.siteIds[::-1]
+
+    def getSiteIdsAndPositions(self, reverse: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        return (self.reverseSiteIds, self.reverseStrandPositions) if reverse else (self.siteIds, self.positions)
+
     def trim(self):
-        if not self.positions:
+        if not self.positions.size:
             return self
         return OpticalMap(self.moleculeId,
-                          self.positions[-1] - self.positions[0] + 1,
-                          list(map(lambda p: p - self.positions[0], self.positions)))
+                          (self.positions[-1] - self.positions[0]).item() + 1,
+                          self.positions - self.positions[0])
 
     def getPositionsWithSiteIds(self, reverse: bool = False):
-        if reverse:
-            i = len(self.positions) + self.shift
-            moleculeEndPosition = self.length - 1
-            for position in self.positions[::-1]:
-                yield PositionWithSiteId(i, moleculeEndPosition - position)
-                i -= 1
-        else:
-            i = 1 + self.shift
-            for position in self.positions:
-                yield PositionWithSiteId(i, position)
-                i += 1
+        siteIds, positions = self.getSiteIdsAndPositions(reverse)
+        for siteId, position in zip(siteIds.tolist(), positions.tolist()):
+            yield PositionWithSiteId(siteId, position)
 
     def getInitialAlignment(self, reference: OpticalMap, sequenceGenerator: SequenceGenerator, minPeakDistance: int,
-                            peaksCount: int, reverseStrand=False):
-        if self.length > reference.length:
+                            peaksCount: int, reverseStrand=False, referenceStart: int = 0, referenceEnd: int = None):
+        """Correlates the query with the reference, or only with its part between referenceStart and referenceEnd
+        if given. Peak positions are always relative to the beginning of the whole reference.
+        """
+        referenceStart = max(referenceStart, 0)
+        referenceEnd = min(referenceEnd, reference.length) if referenceEnd is not None else reference.length
+        if self.length > referenceEnd - referenceStart:
             return EmptyInitialAlignment(self, reference, sequenceGenerator.resolution, sequenceGenerator.blurRadius)
 
         sequence = self.getSequence(sequenceGenerator, reverseStrand)
-        referenceSequence = reference.getSequence(sequenceGenerator)
+        if referenceStart == 0 and referenceEnd == reference.length:
+            referenceSequence = sequenceGenerator.referenceToSequence(reference)
+        else:
+            referenceSequence = reference.getSequence(sequenceGenerator, False, referenceStart,
+                                                      referenceEnd if referenceEnd < reference.length else None)
         correlation = self.__getCorrelation(referenceSequence, sequence)
 
         normalizingFactor = (self.__getCorrelation(referenceSequence, np.ones(len(sequence))) + np.sum(sequence)) / 2
@@ -78,8 +120,8 @@ class OpticalMap:
 
         return InitialAlignment.create(correlation, self, reference, peakPositions, peakProperties, peaksCount,
                                        reverseStrand,
-                                       sequenceGenerator.resolution, sequenceGenerator.blurRadius, 0,
-                                       len(correlation) * sequenceGenerator.resolution)
+                                       sequenceGenerator.resolution, sequenceGenerator.blurRadius, referenceStart,
+                                       referenceStart + len(correlation) * sequenceGenerator.resolution)
 
     def getSequence(self, sequenceGenerator: SequenceGenerator, reverseStrand=False, start: int = 0, end: int = None):
         sequence = sequenceGenerator.positionsToSequence(self.positions, start, end)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 
 class Peak:
+    __slots__ = ("position", "height", "leftProminenceBasePosition", "rightProminenceBasePosition", "score")
     null: Peak
 
     def __init__(self, position: int, height: float, leftBase: int = 0, rightBase: int = 0, score: float = 0.) -> None:
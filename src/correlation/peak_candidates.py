@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from typing import Iterable, List
+
+import numpy as np
+
+from src.correlation.optical_map import InitialAlignment, OpticalMap
+from src.correlation.peak import Peak
+
+
+class PeakCandidates:
+    """Primary correlation peaks of a single query against all references, kept as plain arrays, so that they can be
+    refined again for fragments of the query without repeating the primary cross-correlation.
+    """
+
+    def __init__(self, referenceIds: np.ndarray, positions: np.ndarray, scores: np.ndarray,
+                 reverseStrands: np.ndarray, queryEnd: int):
+        self.referenceIds = referenceIds
+        self.positions = positions
+        self.scores = scores
+        self.reverseStrands = reverseStrands
+        self.queryEnd = queryEnd
+
+    @staticmethod
+    def create(query: OpticalMap, primaryCorrelations: Iterable[InitialAlignment]):
+        peaks = [(c.reference.moleculeId, p.position, p.score, c.reverseStrand)
+                 for c in primaryCorrelations for p in c.peaks]
+        referenceIds, positions, scores, reverseStrands = zip(*peaks) if peaks else ([], [], [], [])
+        return PeakCandidates(np.array(referenceIds, dtype=np.int64),
+                              np.array(positions, dtype=np.float64),
+                              np.array(scores, dtype=np.float64),
+                              np.array(reverseStrands, dtype=bool),
+                              query.positions[-1] if len(query.positions) else 0)
+
+    def __len__(self):
+        return self.positions.size
+
+    def getInitialAlignments(self, fragment: OpticalMap, reference: OpticalMap, resolution: int, blur: int,
+                             start: int = 0, end: int = None, reverseStrand: bool = None) -> List[InitialAlignment]:
+        """Recreates initial alignments of a query fragment with the reference from the stored peaks which lie between
+        start and end, optionally in one orientation only. The alignments carry no correlation, only peaks.
+
+        A reversed sequence starts at the last position of the map, so peaks of the reverse strand are shifted by
+        the part of the query that is missing from the end of the fragment.
+        """
+        selected = (self.referenceIds == reference.moleculeId) & (self.positions >= start)
+        if end is not None:
+            selected &= self.positions <= end
+
+        initialAlignments = []
+        for strand in ([False, True] if reverseStrand is None else [reverseStrand]):
+            indices = np.flatnonzero(selected & (self.reverseStrands == strand))
+            if not indices.size:
+                continue
+            shift = self.queryEnd - fragment.positions[-1] if strand else 0
+            peaks = [Peak(position + shift, score, position + shift, position + shift, score)
+                     for position, score in zip(self.positions[indices], self.scores[indices])]
+            initialAlignments.append(InitialAlignment(np.array([]), fragment, reference, peaks, strand, 0.,
+                                                      resolution, blur))
+        return initialAlignments
@@ -1,13 +1,30 @@
-from typing import List
+from __future__ import annotations
+
+from typing import Dict, TYPE_CHECKING
+
+import numpy as np
 
 from src.correlation.vectorise import vectorisePositions, blur
 
+if TYPE_CHECKING:
+    from src.correlation.optical_map import OpticalMap
+
 
 class SequenceGenerator:
     def __init__(self, resolution: int, blurRadius: int) -> None:
         self.resolution = resolution
         self.blurRadius = blurRadius
+        self.__referenceSequences: Dict[int, np.ndarray] = {}
+
+    def positionsToSequence(self, positions: np.ndarray, start: int = 0, end: int = None):
+        return blur(vectorisePositions(positions, self.resolution, start, end), self.blurRadius)
 
-    def positionsToSequence(self, positions: List, start: int = 0, end: int = None):
-        vector = list(vectorisePositions(positions, self.resolution, start, end))
-        return blur(vector, self.blurRadius)
+    def referenceToSequence(self, reference: OpticalMap) -> np.ndarray:
+        """Sequence of the whole reference map, kept by its id, as every query is correlated with it. It holds only
+        zeros and ones, so it is kept as int8 to take an eighth of the memory in each worker.
+        """
+        sequence = self.__referenceSequences.get(reference.moleculeId)
+        if sequence is None:
+            sequence = self.__referenceSequences[reference.moleculeId] = \
+                self.positionsToSequence(reference.positions).astype(np.int8)
+        return sequence
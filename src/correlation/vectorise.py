@@ -1,39 +1,41 @@
-from itertools import zip_longest
-from typing import List
+from math import floor
+from typing import Sequence
 
 import numpy as np
 
 
-def vectorisePositions(positions: List[int], resolution: int = 100, start: int = 0, end: int = None):
+def vectorisePositions(positions: Sequence[float], resolution: int = 100, start: int = 0, end: int = None) \
+        -> np.ndarray:
+    """Marks windows of the given resolution, counted from start, which contain any position. The vector ends with
+    the last marked window, or with the window containing end if a position lies beyond it.
+    """
     if not isinstance(resolution, int) or resolution < 1:
         raise ValueError(resolution)
+    positions = np.asarray(positions, dtype=float)
     end = end or positions[-1]
-    window_start = start
-    window_end = window_start + resolution
-    for position in positions:
-        if position < window_start:
-            continue
-        while position >= window_end:
-            window_start += resolution
-            window_end += resolution
-            yield 0
-            if window_start > end:
-                return
-
-        yield 1
-        window_start += resolution
-        window_end += resolution
-
-
-def blur(vector: List[int], radius: int) -> np.ndarray:
+    windows = np.unique(((positions[positions >= start] - start) // resolution).astype(int))
+    if not windows.size:
+        return np.zeros(0, dtype=int)
+
+    lastWindowBeforeEnd = max(floor((end - start) / resolution), 0)
+    nextWindows = np.concatenate([[0], windows[:-1] + 1])
+    endReached = np.flatnonzero((windows > nextWindows) & (windows > lastWindowBeforeEnd))
+    if endReached.size:
+        windows = windows[:endReached[0]]
+        length = max(nextWindows[endReached[0]], lastWindowBeforeEnd) + 1
+    else:
+        length = windows[-1] + 1
+    vector = np.zeros(length, dtype=int)
+    vector[windows] = 1
+    return vector
+
+
+def blur(vector: Sequence[int], radius: int) -> np.ndarray:
     if not isinstance(radius, int) or radius < 0:
         raise ValueError(radius)
 
-    shifts = range(1, radius + 1)
-    shiftedVectors = [vector]
-    for shift in shifts:
-        shiftedVectors.append(vector[shift:])
-        shiftedVectors.append(shift * [0] + vector)
-
-    return np.array(
-        [1 if any(position) else 0 for position in zip_longest(*shiftedVectors, fillvalue=0)][0: len(vector)])
+    vector = np.asarray(vector, dtype=int)
+    if not vector.size:
+        return vector
+    neighbours = np.convolve(vector != 0, np.ones(2 * radius + 1, dtype=int))
+    return (neighbours[radius:radius + len(vector)] > 0).astype(int)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC
-from dataclasses import dataclass, field
+from dataclasses import dataclass, fields
 from typing import NamedTuple, List
 
 
@@ -12,6 +12,7 @@ class BenchmarkAlignmentPosition(NamedTuple):
 
 @dataclass(frozen=True)
 class BenchmarkAlignedPair:
+    __slots__ = ("reference", "query")
     reference: BenchmarkAlignmentPosition
     query: BenchmarkAlignmentPosition
 
@@ -30,13 +31,18 @@ class BenchmarkAlignedPair:
     def toString(self, includePositions: bool):
         return self.__repr__()
 
+    def __reduce__(self):
+        return self.__class__, tuple(getattr(self, f.name) for f in fields(self))
+
     def __repr__(self) -> str:
         return f"({self.reference.siteId}, {self.query.siteId})"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class BenchmarkAlignedPairWithDistance(BenchmarkAlignedPair):
-    distance: int = field(compare=False)
+    """Equal to pairs of the same sites regardless of distance, by the equality and hash of the base class."""
+    __slots__ = ("distance",)
+    distance: int
 
     @staticmethod
     def calculateDistance(pair: BenchmarkAlignedPair, firstPair: BenchmarkAlignedPair | None, reverseStrand: bool):
@@ -1,5 +1,5 @@
 import os.path
-from typing import TextIO, List
+from typing import TextIO
 
 from matplotlib import pyplot as plt
 
@@ -8,7 +8,7 @@ from src.diagnostic.plot import plotCorrelation, plotRefinedCorrelation
 from src.extensions.extension import Extension
 from src.extensions.messages import InitialAlignmentMessage, CorrelationResultMessage, AlignmentResultRowMessage, \
     MultipleAlignmentResultRowsMessage
-from src.parsers.alignment_benchmark_reader import AlignmentBenchmarkReader
+from src.parsers.alignment_benchmark_reader import AlignmentBenchmarkIndex
 
 
 class DiagnosticsWriter:
@@ -43,17 +43,19 @@ class SecondaryCorrelationPlotter(Extension):
         self.writer = writer
 
     def handle(self, message: CorrelationResultMessage):
-        fig = plotRefinedCorrelation(message.initialAlignment, message.refinedAlignment)
+        if message.initialAlignment.correlation.size:
+            fig = plotRefinedCorrelation(message.initialAlignment, message.refinedAlignment)
+        else:
+            fig = plotCorrelation(message.refinedAlignment)
         self.writer.savePlot(fig, f"secondary_cor_{message.refinedAlignment.query.moleculeId}_{message.index}.svg")
 
 
 class AlignmentPlotter(Extension):
     messageType = AlignmentResultRowMessage
 
-    def __init__(self, writer: DiagnosticsWriter, benchmarkReader: AlignmentBenchmarkReader, benchmarkFile: TextIO):
+    def __init__(self, writer: DiagnosticsWriter, benchmarkIndex: AlignmentBenchmarkIndex = None):
         self.writer = writer
-        self.benchmarkReader = benchmarkReader
-        self.benchmarkFile = benchmarkFile
+        self.benchmarkIndex = benchmarkIndex
 
     def handle(self, message: AlignmentResultRowMessage):
         if not message.alignment.alignedPairs:
@@ -67,34 +69,31 @@ class AlignmentPlotter(Extension):
                                           f"_{message.query.moleculeId}_{message.index}.svg")
 
     def getBenchmarkAlignment(self, message):
-        if not self.benchmarkFile:
+        if not self.benchmarkIndex:
             return None
-        return next(
-            iter(self.benchmarkReader.read(self.benchmarkFile, queryIds=[message.query.moleculeId])))
+        return next(iter(self.benchmarkIndex.get(message.query.moleculeId)), None)
 
 
 class MultipleAlignmentsPlotter(Extension):
     messageType = MultipleAlignmentResultRowsMessage
 
-    def __init__(self, writer: DiagnosticsWriter, benchmarkReader: AlignmentBenchmarkReader, benchmarkFile: TextIO):
+    def __init__(self, writer: DiagnosticsWriter, benchmarkIndex: AlignmentBenchmarkIndex = None):
         self.writer = writer
-        self.benchmarkReader = benchmarkReader
-        self.benchmarkAlignmentFile = benchmarkFile
+        self.benchmarkIndex = benchmarkIndex
 
     def handle(self, message: MultipleAlignmentResultRowsMessage):
         aligned = [m for m in message.messages if m.alignment.alignedPairs]
         if not aligned:
             return
 
-        benchmarkAlignments = self.getBenchmarkAlignment([m.query.moleculeId for m in aligned])
         for m in aligned:
             plot = AlignmentPlot(m.reference, m.query, m.alignment, m.correlation,
-                                 next((a for a in benchmarkAlignments if a.queryId == m.query.moleculeId), None))
+                                 self.getBenchmarkAlignment(m.query.moleculeId))
 
             self.writer.savePlot(plot.figure, f"Alignment_ref_{m.reference.moleculeId}_query"
                                               f"_{m.query.moleculeId}_{m.index}.svg")
 
-    def getBenchmarkAlignment(self, queryIds: List[int]):
-        if not self.benchmarkAlignmentFile:
-            return []
-        return self.benchmarkReader.read(self.benchmarkAlignmentFile, queryIds=queryIds)
+    def getBenchmarkAlignment(self, queryId: int):
+        if not self.benchmarkIndex:
+            return None
+        return next(iter(self.benchmarkIndex.get(queryId)), None)
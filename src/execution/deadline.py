@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, Iterable, List, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class Deadline:
+    """Wall-clock time limit of processing a single query. Monotonic clock is used, so that the deadline can be
+    checked in any process of the machine.
+    """
+
+    def __init__(self, time: float | None = None):
+        self.time = time
+
+    @staticmethod
+    def start(budget: float | None) -> Deadline:
+        return Deadline(time.monotonic() + budget if budget else None)
+
+    def passed(self) -> bool:
+        return self.time is not None and time.monotonic() > self.time
+
+    def map(self, function: Callable[[T], R], items: Iterable[T]) -> Tuple[List[R], bool]:
+        """Maps the first item and the following ones until the deadline passes.
+
+        :return: results and whether all items were mapped
+        """
+        results = []
+        for item in items:
+            if results and self.passed():
+                return results, False
+            results.append(function(item))
+        return results, True
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, Iterator, TypeVar, List, Dict
+
+from multiprocess.pool import Pool
+from tqdm import tqdm
+
+from src.execution.worker import initialiseWorker, runInWorker
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class Executor:
+    def __init__(self, workers: int | None, disableProgressBar: bool):
+        self.workers = workers
+        self.disableProgressBar = disableProgressBar
+
+    @abstractmethod
+    def imap(self, function: Callable[[T], R], items: List[T]) -> Iterator[R]:
+        """Applies the function to all items, yielding results in the order of the items."""
+        pass
+
+    def close(self):
+        pass
+
+    def _withProgress(self, results: Iterable[R], total: int) -> Iterator[R]:
+        return iter(tqdm(results, total=total, disable=self.disableProgressBar))
+
+
+class ProcessExecutor(Executor):
+    """Pool of worker processes, which lives until the executor is closed, so that all passes of the workflow reuse
+    the same workers, with their caches already warm. Functions are shipped to the workers once, when the pool
+    starts, and only the items are sent with each call. The pool is restarted if called with other functions.
+
+    Workers keep the functions, with everything they reference, as they were when the pool started. The executor
+    has to be closed when that state changes, so that the next call starts the workers again.
+    """
+
+    def __init__(self, workers: int | None, disableProgressBar: bool):
+        super().__init__(workers, disableProgressBar)
+        self.__pool: Pool | None = None
+        self.__functions: Dict[str, Callable] | None = None
+        self.__poolWorkers: int | None = None
+
+    def imap(self, function: Callable[[T], R], items: List[T]) -> Iterator[R]:
+        pool = self.getPool({"imap": function})
+        return self._withProgress(pool.imap(partial(runInWorker, "imap"), items), len(items))
+
+    def getPool(self, functions: Dict[str, Callable], workers: int = None) -> Pool:
+        """Pool whose workers run the functions by name, see runInWorker. The running pool is reused if it was
+        started with the same functions and number of workers.
+        """
+        workers = workers or self.workers
+        if self.__pool is None or functions != self.__functions or workers != self.__poolWorkers:
+            self.close()
+            self.__pool = Pool(workers, initialiseWorker, (functions,))
+            self.__functions = functions
+            self.__poolWorkers = workers
+        return self.__pool
+
+    def close(self):
+        if self.__pool is not None:
+            self.__pool.terminate()
+            self.__pool.join()
+            self.__pool = None
+            self.__functions = None
+            self.__poolWorkers = None
+
+
+class ThreadExecutor(Executor):
+    """Worker threads sharing memory with the caller, so nothing is serialized. Pays off when the work is dominated
+    by NumPy and SciPy code that does not hold the GIL, such as FFT cross-correlation.
+    """
+
+    def imap(self, function: Callable[[T], R], items: List[T]) -> Iterator[R]:
+        with ThreadPoolExecutor(self.workers) as executor:
+            yield from self._withProgress(executor.map(function, items), len(items))
+
+
+class SerialExecutor(Executor):
+    def imap(self, function: Callable[[T], R], items: List[T]) -> Iterator[R]:
+        return self._withProgress(map(function, items), len(items))
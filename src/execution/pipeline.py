@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import pickle
+import threading
+import time
+from itertools import chain, repeat
+from queue import Queue, Empty, Full
+from typing import Callable, Any, List, NamedTuple, Iterable, Iterator
+
+from multiprocess.pool import Pool
+from tqdm import tqdm
+
+from src.execution.executors import ProcessExecutor
+from src.execution.worker import runPickledInWorker
+
+
+class PipelineStage(NamedTuple):
+    name: str
+    function: Callable[[Any], Any]
+    workers: int = 1
+    inProcess: bool = False
+
+
+class StageStatistics:
+    def __init__(self, stage: PipelineStage):
+        self.name = stage.name
+        self.workers = stage.workers
+        self.inProcess = stage.inProcess
+        self.items = 0
+        self.busyTime = 0.
+        self.__lock = threading.Lock()
+
+    def add(self, busyTime: float):
+        with self.__lock:
+            self.items += 1
+            self.busyTime += busyTime
+
+    def utilisation(self, wallTime: float):
+        return self.busyTime / (wallTime * self.workers) if wallTime > 0 else 0.
+
+    def format(self, wallTime: float):
+        return "{0:<8} {1:>2} {2:<7} {3:>7} items {4:>9.2f} s busy {5:>6.1%} utilisation".format(
+            self.name, self.workers, "process" if self.inProcess else "thread", self.items, self.busyTime,
+            self.utilisation(wallTime))
+
+
+_END = object()
+_POLL_INTERVAL = 0.1
+
+
+class Pipeline:
+    """Runs items through a sequence of stages, each served by its own workers and connected to the next stage by
+    a bounded queue, so that stages with different profiles (GIL releasing NumPy code and pure Python code) overlap.
+    Workers of a stage are threads. Threads of an in-process stage only hand their items over to the pool of
+    worker processes of processExecutor, which the stage functions are shipped to once, when the pool starts, and
+    which is reused by later calls. Without processExecutor, the pool lives for a single call.
+    Results are yielded in the order of the input items. When a stage raises, or the caller stops iterating, all
+    stages stop taking new items and the call returns once items in progress are finished.
+    """
+
+    def __init__(self, stages: List[PipelineStage], queueSize: int = None, disableProgressBar: bool = False,
+                 processExecutor: ProcessExecutor = None):
+        self.stages = stages
+        self.processExecutor = processExecutor
+        self.queueSize = queueSize or 2 * max(s.workers for s in stages)
+        self.disableProgressBar = disableProgressBar
+        self.statistics = [StageStatistics(s) for s in stages]
+        self.wallTime = 0.
+
+    def imap(self, items: Iterable[Any]) -> Iterator[Any]:
+        items = list(items)
+        processStages = [s for s in self.stages if s.inProcess]
+        processExecutor = self.processExecutor or ProcessExecutor(None, True)
+        pool = processExecutor.getPool({s.name: s.function for s in processStages},
+                                       sum(s.workers for s in processStages)) if processStages else None
+        queues = [Queue(self.queueSize) for _ in range(len(self.stages) + 1)]
+        stopped = threading.Event()
+        failures: List[BaseException] = []
+        threads = [threading.Thread(target=self.__feed, args=(items, queues[0], stopped), daemon=True)]
+        nextStagesWorkers = [s.workers for s in self.stages[1:]] + [0]
+        for stage, statistics, inputQueue, outputQueue, nextStageWorkers in zip(
+                self.stages, self.statistics, queues, queues[1:], nextStagesWorkers):
+            remainingWorkers = [stage.workers]
+            lock = threading.Lock()
+            threads += [threading.Thread(target=self.__work,
+                                         args=(stage, statistics, pool, inputQueue, outputQueue, nextStageWorkers,
+                                               remainingWorkers, lock, stopped, failures),
+                                         daemon=True)
+                        for _ in range(stage.workers)]
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            yield from self.__collect(queues[-1], len(items), stopped, failures)
+        finally:
+            self.wallTime = time.perf_counter() - start
+            stopped.set()
+            for thread in threads:
+                thread.join()
+            if processExecutor is not self.processExecutor:
+                processExecutor.close()
+
+    def formatStatistics(self):
+        return "\n".join(["Pipeline finished in {0:.2f} s".format(self.wallTime)] +
+                         [s.format(self.wallTime) for s in self.statistics])
+
+    def __feed(self, items: List[Any], queue: Queue, stopped: threading.Event):
+        for item in chain(enumerate(items), repeat(_END, self.stages[0].workers)):
+            if not self.__put(queue, item, stopped):
+                return
+
+    def __work(self, stage: PipelineStage, statistics: StageStatistics, pool: Pool | None, inputQueue: Queue,
+               outputQueue: Queue, nextStageWorkers: int, remainingWorkers: List[int], lock: threading.Lock,
+               stopped: threading.Event, failures: List[BaseException]):
+        while (item := self.__get(inputQueue, stopped)) is not _END:
+            index, value = item
+            start = time.perf_counter()
+            try:
+                value = pickle.loads(pool.apply(runPickledInWorker,
+                                                (stage.name, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))) \
+                    if stage.inProcess else stage.function(value)
+            except BaseException as exception:
+                failures.append(exception)
+                stopped.set()
+                return
+            statistics.add(time.perf_counter() - start)
+            if not self.__put(outputQueue, (index, value), stopped):
+                return
+
+        with lock:
+            remainingWorkers[0] -= 1
+            if remainingWorkers[0]:
+                return
+        for _ in range(nextStageWorkers):
+            if not self.__put(outputQueue, _END, stopped):
+                return
+
+    def __collect(self, queue: Queue, itemsCount: int, stopped: threading.Event, failures: List[BaseException]):
+        pending = {}
+        nextIndex = 0
+        with tqdm(total=itemsCount, disable=self.disableProgressBar) as progressBar:
+            while nextIndex < itemsCount:
+                item = self.__get(queue, stopped)
+                if item is _END:
+                    raise failures[0]
+                index, value = item
+                pending[index] = value
+                progressBar.update()
+                while nextIndex in pending:
+                    yield pending.pop(nextIndex)
+                    nextIndex += 1
+
+    @staticmethod
+    def __get(queue: Queue, stopped: threading.Event):
+        """:return: next item of the queue, or _END once the pipeline is stopped"""
+        while not stopped.is_set():
+            try:
+                return queue.get(timeout=_POLL_INTERVAL)
+            except Empty:
+                pass
+        return _END
+
+    @staticmethod
+    def __put(queue: Queue, item: Any, stopped: threading.Event) -> bool:
+        """:return: whether the item was put before the pipeline stopped"""
+        while not stopped.is_set():
+            try:
+                queue.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except Full:
+                pass
+        return False
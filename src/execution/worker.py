@@ -0,0 +1,22 @@
+import pickle
+from typing import Callable, Any, Dict
+
+_functions: Dict[str, Callable[[Any], Any]] = {}
+
+
+def initialiseWorker(functions: Dict[str, Callable[[Any], Any]]):
+    """Pool initializer, keeps the functions in the worker process, so that they are shipped to it only once,
+    together with everything they reference.
+    """
+    _functions.update(functions)
+
+
+def runInWorker(name: str, item: Any):
+    return _functions[name](item)
+
+
+def runPickledInWorker(name: str, pickledItem: bytes) -> bytes:
+    """Same as runInWorker, with the item and the result serialised by the standard pickle, which is several times
+    faster than dill used by the pool for objects without functions.
+    """
+    return pickle.dumps(_functions[name](pickle.loads(pickledItem)), pickle.HIGHEST_PROTOCOL)
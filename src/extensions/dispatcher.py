@@ -1,3 +1,4 @@
+import threading
 from typing import List
 
 from src.extensions.extension import Extension
@@ -7,11 +8,13 @@ from src.extensions.messages import Message
 class Dispatcher:
     def __init__(self, extensions: List[Extension] = None):
         self.__extensions = extensions or []
+        self.__lock = threading.Lock()
 
     def addExtension(self, extension: Extension):
         self.__extensions.append(extension)
 
     def dispatch(self, message: Message):
-        for extension in self.__extensions:
-            if extension.canHandle(message):
-                extension.handle(message)
+        with self.__lock:
+            for extension in self.__extensions:
+                if extension.canHandle(message):
+                    extension.handle(message)
@@ -7,9 +7,10 @@ from src.args import Args
 from src.correlation.optical_map import OpticalMap
 from src.correlation.peaks_selector import PeaksSelector
 from src.correlation.sequence_generator import SequenceGenerator
+from src.execution.executors import Executor
 from src.extensions.dispatcher import Dispatcher
 from src.parsers.xmap_reader import XmapReader
-from src.workflow_coordinator import _WorkflowCoordinator
+from src.workflow_coordinator import _WorkflowCoordinator, ReferenceRegion, AlignmentSearch
 
 
 class _MultiPassWorkflowCoordinator(_WorkflowCoordinator):
@@ -20,8 +21,9 @@ class _MultiPassWorkflowCoordinator(_WorkflowCoordinator):
                  aligner: Aligner,
                  dispatcher: Dispatcher,
                  peaksSelector: PeaksSelector,
+                 executor: Executor,
                  xmapReader: XmapReader):
-        super().__init__(args, primaryGenerator, secondaryGenerator, aligner, dispatcher, peaksSelector)
+        super().__init__(args, primaryGenerator, secondaryGenerator, aligner, dispatcher, peaksSelector, executor)
         self.xmapReader = xmapReader
 
     def execute(self, referenceMaps: List[OpticalMap], queryMaps: List[OpticalMap]) -> List[AlignmentResultRow]:
@@ -59,14 +61,37 @@ class _MultiPassWorkflowCoordinator(_WorkflowCoordinator):
             return joinedRows
 
     def getSecondPassAlignmentRows(self, alignmentResultRows, queryMaps, referenceMaps):
-        unalignedFragmentsLists = \
-            [alignmentResultRow.getUnalignedFragments(queryMaps) for alignmentResultRow in alignmentResultRows]
-        unalignedFragments = [item for row in unalignedFragmentsLists for item in row]
-        alignmentResultRowsSecondPass = super().execute(referenceMaps, unalignedFragments)
+        queryMaps = {q.moleculeId: q for q in queryMaps}
+        if self.args.secondPassMode == "full":
+            referenceRegions = [ReferenceRegion(r.moleculeId) for r in referenceMaps]
+            searches = [AlignmentSearch(referenceRegions, fragment, self.__getPeakCandidatesToReuse(alignmentResultRow))
+                        for alignmentResultRow in alignmentResultRows
+                        for fragment in alignmentResultRow.getUnalignedFragments(queryMaps)]
+        else:
+            searches = [AlignmentSearch([self.__getJoinableRegion(alignmentResultRow)],
+                                        fragment,
+                                        self.__getPeakCandidatesToReuse(alignmentResultRow))
+                        for alignmentResultRow in alignmentResultRows
+                        for fragment in alignmentResultRow.getUnalignedFragments(queryMaps)]
+        alignmentResultRowsSecondPass = self.executeSearches(searches)
         alignmentResultRowsSecondPass = [alignmentResultRowRest.setAlignedRest(True) for alignmentResultRowRest in
                                          alignmentResultRowsSecondPass]
         return alignmentResultRowsSecondPass
 
+    def __getPeakCandidatesToReuse(self, alignmentResultRow: AlignmentResultRow):
+        return self.peakCandidates.get(alignmentResultRow.queryId) if self.args.reusePrimaryPeaks else None
+
+    def __getJoinableRegion(self, alignmentResultRow: AlignmentResultRow):
+        """Region of the reference in which alignments of the query fragments can still be joined with the first pass
+        alignment (see AlignmentResultRow.check_overlap). It is extended by twice the query length, so that it covers
+        the whole fragment sequence wherever its aligned part lies.
+        """
+        margin = self.args.maxDifference + 2 * alignmentResultRow.queryLength
+        return ReferenceRegion(alignmentResultRow.referenceId,
+                               int(alignmentResultRow.referenceStartPosition - margin),
+                               int(alignmentResultRow.referenceEndPosition + margin),
+                               alignmentResultRow.reverseStrand)
+
     def saveAdditionalOutput(
             self,
             rowsWithoutSubsequentAlignmentsForSingleQueryRest: List[AlignmentResultRow],
@@ -76,8 +101,11 @@ class _MultiPassWorkflowCoordinator(_WorkflowCoordinator):
             self.args.queryFile.name,
             rowsWithoutSubsequentAlignmentsForSingleQueryRest)
 
-        self.xmapReader.writeAlignments(self.createAdditionalOutputFile(fileNumber), restResult, self.args)
+        with self.createAdditionalOutputFile(fileNumber) as file:
+            self.xmapReader.writeAlignments(file, restResult, self.args)
 
     def createAdditionalOutputFile(self, number: int):
-        return open("{0}_{2}{1}".format(*os.path.splitext(self.args.outputFile.name) + (number,)), mode='w',
-                    encoding=self.args.outputFile.encoding)
+        name = self.args.outputFile.name
+        compression = ".gz" if name.endswith(".gz") else ""
+        root, extension = os.path.splitext(name[:len(name) - len(compression)])
+        return open(f"{root}_{number}{extension}{compression}", mode='w', encoding=self.args.outputFile.encoding)
@@ -1,5 +1,7 @@
+from __future__ import annotations
+
 import itertools
-from typing import TextIO, Iterable, List
+from typing import TextIO, Iterable, List, Dict
 
 from src.diagnostic.benchmark_alignment import BenchmarkAlignment
 from src.parsers.simulation_data_as_xmap_reader import SimulationDataAsXmapReader
@@ -20,3 +22,23 @@ class AlignmentBenchmarkReader:
             return self.simulationReader.readAlignments(file, queryIds=queryIds)
         else:
             raise Exception(f"File {file.name} is in unknown format. Either XMAP or SDATA formats are supported.")
+
+
+class AlignmentBenchmarkIndex:
+    """Benchmark alignments grouped by query id. They are all grouped when the index is created, so that it can be
+    passed to worker processes, which only look them up and never touch the benchmark file.
+    """
+
+    def __init__(self, alignments: Iterable[BenchmarkAlignment]):
+        self.__alignments: Dict[int, List[BenchmarkAlignment]] = {}
+        for alignment in alignments:
+            self.__alignments.setdefault(alignment.queryId, []).append(alignment)
+
+    @staticmethod
+    def read(reader: AlignmentBenchmarkReader, file: TextIO, queryIds: Iterable[int] = None) \
+            -> AlignmentBenchmarkIndex:
+        return AlignmentBenchmarkIndex(reader.read(file, queryIds))
+
+    def get(self, queryId: int) -> List[BenchmarkAlignment]:
+        """:return: benchmark alignments of the query in order of the file"""
+        return self.__alignments.get(queryId, [])
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import List
+
+import numpy as np
+
+from src.correlation.optical_map import OpticalMap
+
+
+class CmapCache:
+    """Parsed maps of a CMAP file kept in a sidecar directory next to it, as arrays of concatenated label positions,
+    offsets of each map in them, map ids and lengths. Arrays are memory-mapped when loaded, so positions of the maps
+    are views of the cache file and nothing is copied.
+
+    The cache is valid as long as size and modification time of the CMAP file are the ones it was created from.
+    """
+
+    version = 1
+    __arrays = ["positions", "offsets", "ids", "lengths"]
+
+    def __init__(self, cmapPath: str):
+        self.cmapPath = cmapPath
+        self.directory = cmapPath + ".cache"
+
+    def load(self) -> List[OpticalMap] | None:
+        """:return: cached maps or None if there is no valid cache"""
+        try:
+            with open(self.__sourcePath) as sourceFile:
+                if json.load(sourceFile) != self.__getSource():
+                    return None
+            positions, offsets, ids, lengths = [np.load(self.__arrayPath(name), mmap_mode="r").view(np.ndarray)
+                                                for name in self.__arrays]
+        except (OSError, ValueError):
+            return None
+        return [OpticalMap(moleculeId, length, positions[start:end]) for moleculeId, length, start, end
+                in zip(ids.tolist(), lengths.tolist(), offsets[:-1].tolist(), offsets[1:].tolist())]
+
+    def save(self, maps: List[OpticalMap]):
+        """Writes the source description last, so that an interrupted write leaves no valid cache behind."""
+        arrays = {
+            "positions": np.concatenate([m.positions for m in maps]) if maps else np.zeros(0),
+            "offsets": np.cumsum([0] + [len(m.positions) for m in maps]),
+            "ids": np.array([m.moleculeId for m in maps], dtype=np.int64),
+            "lengths": np.array([m.length for m in maps], dtype=np.int64)
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if os.path.exists(self.__sourcePath):
+                os.remove(self.__sourcePath)
+            for name in self.__arrays:
+                np.save(self.__arrayPath(name), arrays[name])
+            with open(self.__sourcePath, "w") as sourceFile:
+                json.dump(self.__getSource(), sourceFile)
+        except OSError:
+            pass
+
+    @property
+    def __sourcePath(self):
+        return os.path.join(self.directory, "source.json")
+
+    def __arrayPath(self, name: str):
+        return os.path.join(self.directory, name + ".npy")
+
+    def __getSource(self):
+        status = os.stat(self.cmapPath)
+        return {"version": self.version, "size": status.st_size, "mtime": status.st_mtime_ns}
@@ -1,12 +1,18 @@
+import os
 from typing import List, TextIO, Iterable
 
+import numpy as np
+
 from src.correlation.optical_map import OpticalMap
 from src.parsers.bionano_file_reader import BionanoFileReader
+from src.parsers.cmap_cache import CmapCache
 
 
 class CmapReader:
-    def __init__(self, reader: BionanoFileReader = None) -> None:
+    def __init__(self, reader: BionanoFileReader = None, useCache: bool = False) -> None:
+        """:param useCache: whether to keep parsed maps of files in CmapCache and load them from it"""
         self.reader = reader or BionanoFileReader()
+        self.useCache = useCache
 
     def readQueries(self, file: TextIO, moleculeIds: Iterable[int] = None):
         return self.__read(file, moleculeIds or [])
@@ -21,19 +27,45 @@ class CmapReader:
         return self.__read(file, chromosomes or [])
 
     def __read(self, file: TextIO, moleculeIds: Iterable[int] = None) -> List[OpticalMap]:
+        path = getattr(file, "name", None)
+        if not self.useCache or not isinstance(path, str) or not os.path.isfile(path):
+            return self.__parse(file, moleculeIds)
+
+        cache = CmapCache(path)
+        maps = cache.load()
+        if maps is None:
+            maps = self.__parse(file)
+            cache.save(maps)
+        moleculeIds = set(moleculeIds or [])
+        return [m for m in maps if m.moleculeId in moleculeIds] if moleculeIds else maps
+
+    def __parse(self, file: TextIO, moleculeIds: Iterable[int] = None) -> List[OpticalMap]:
+        """Groups rows of all maps at once, by sorting label sites by molecule id and position. The length of each
+        map is the position of its first end marker, which is a row with label channel 0.
+        """
         maps = self.reader.readFile(file, ["CMapId", "Position", "LabelChannel"])
 
         if moleculeIds:
             maps = maps[maps["CMapId"].isin(moleculeIds)]
 
-        opticalMaps = maps.groupby("CMapId").apply(self.__parseCmapRowsGroup)
-        return [] if opticalMaps.empty else opticalMaps[opticalMaps.notnull()].tolist()
-
-    @staticmethod
-    def __parseCmapRowsGroup(group):
-        moleculeId = group["CMapId"].iloc[0]
-        labelSites = group[group["LabelChannel"] != 0]
-        moleculeEndMarker = group[group["LabelChannel"] == 0].iloc[0]
-        length = int(moleculeEndMarker["Position"])
-        positions = labelSites["Position"].sort_values().tolist()
-        return OpticalMap(moleculeId, length, positions) if positions else None
+        ids = maps["CMapId"].to_numpy()
+        positions = maps["Position"].to_numpy(dtype=float)
+        isLabelSite = maps["LabelChannel"].to_numpy() != 0
+
+        endMarkerIds, firstEndMarkers = np.unique(ids[~isLabelSite], return_index=True)
+        endMarkerPositions = positions[~isLabelSite][firstEndMarkers]
+        labelSiteIds = ids[isLabelSite]
+        labelSitePositions = positions[isLabelSite]
+        order = np.lexsort((labelSitePositions, labelSiteIds))
+        labelSiteIds = labelSiteIds[order]
+        labelSitePositions = labelSitePositions[order]
+
+        mapStarts = np.flatnonzero(np.diff(labelSiteIds)) + 1
+        mapIds = np.unique(labelSiteIds)
+        withoutEndMarker = ~np.isin(mapIds, endMarkerIds)
+        if withoutEndMarker.any():
+            raise ValueError(f"Map {mapIds[withoutEndMarker][0]} has no end marker")
+
+        lengths = endMarkerPositions[np.searchsorted(endMarkerIds, mapIds)].astype(int)
+        return [OpticalMap(moleculeId, length, mapPositions) for moleculeId, length, mapPositions
+                in zip(mapIds.tolist(), lengths.tolist(), np.split(labelSitePositions, mapStarts))]
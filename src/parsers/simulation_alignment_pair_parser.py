@@ -1,9 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
 
 from src.correlation.optical_map import OpticalMap
 from src.diagnostic.benchmark_alignment import BenchmarkAlignedPair, BenchmarkAlignmentPosition, \
     BenchmarkAlignedPairWithDistance
+from src.parsers.xmap_alignment_pair_parser import createPairsWithDistance
 
 
 class BaseSimulationAlignmentPairParser(ABC):
@@ -11,6 +15,30 @@ class BaseSimulationAlignmentPairParser(ABC):
     def parse(self, simulationDetail: str, queryId: int, referenceId: int, reverseStrand: bool):
         pass
 
+    def parseAll(self, simulationDetails: Sequence[str], queryIds: Sequence[int], referenceIds: Sequence[int],
+                 reverseStrands: Sequence[bool]) -> List[List[BenchmarkAlignedPair]]:
+        """Parses simulation details of many rows at once."""
+        return [self.parse(*row) for row in zip(simulationDetails, queryIds, referenceIds, reverseStrands)]
+
+    @staticmethod
+    def _splitSimulationDetails(simulationDetails: Sequence[str], reverseStrands: Sequence[bool]):
+        """Pairs of all rows split in bulk from details such as 1:0;FP;1:1,1:2, where the n-th item separated by
+        semicolons lists 0-based reference site indices of query site n, and FP marks a false positive site.
+
+        :return: 0-based reference site indices and query site ids of pairs of each row, reversed on reverse strand
+        """
+        sites = pd.Series(list(simulationDetails), dtype=object).str.split(";").explode()
+        sites = pd.DataFrame({"site": sites, "querySiteId": sites.groupby(level=0).cumcount() + 1})
+        sites = sites[sites["site"] != "FP"]
+        pairs = sites.assign(site=sites["site"].str.split(",")).explode("site")
+        pairs = pairs[(pairs["site"] != "FP") & (pairs["site"] != "")]
+        rows = pairs.index.to_numpy(dtype=int)
+        splits = np.cumsum(np.bincount(rows, minlength=len(simulationDetails)))[:-1]
+        referenceSiteIndices = np.split(pairs["site"].str.split(":").str[1].to_numpy(dtype=int), splits)
+        querySiteIds = np.split(pairs["querySiteId"].to_numpy(dtype=int), splits)
+        return ([r[::-1] if reverse else r for r, reverse in zip(referenceSiteIndices, reverseStrands)],
+                [q[::-1] if reverse else q for q, reverse in zip(querySiteIds, reverseStrands)])
+
 
 class SimulationAlignmentPairParser(BaseSimulationAlignmentPairParser):
     def parse(self, simulationDetail: str, queryId: int, referenceId: int, reverseStrand: bool):
@@ -29,15 +57,32 @@ class SimulationAlignmentPairParser(BaseSimulationAlignmentPairParser):
         else:
             return [BenchmarkAlignedPair.create(simulationDetailOfPosition.split(":")[1], str(querySiteId))]
 
+    def parseAll(self, simulationDetails: Sequence[str], queryIds: Sequence[int], referenceIds: Sequence[int],
+                 reverseStrands: Sequence[bool]) -> List[List[BenchmarkAlignedPair]]:
+        return [[BenchmarkAlignedPair(BenchmarkAlignmentPosition(r, 0), BenchmarkAlignmentPosition(q, 0))
+                 for r, q in zip(referenceSiteIndices.tolist(), querySiteIds.tolist())]
+                for referenceSiteIndices, querySiteIds
+                in zip(*self._splitSimulationDetails(simulationDetails, reverseStrands))]
+
 
 class SimulationAlignmentPairWithDistanceParser(BaseSimulationAlignmentPairParser):
     def __init__(self, references: List[OpticalMap], queries: List[OpticalMap]):
         self.references = references
         self.queries = queries
+        self.referencesById = {r.moleculeId: r for r in reversed(references)}
+        self.queriesById = {q.moleculeId: q for q in reversed(queries)}
+
+    def parseAll(self, simulationDetails: Sequence[str], queryIds: Sequence[int], referenceIds: Sequence[int],
+                 reverseStrands: Sequence[bool]) -> List[List[BenchmarkAlignedPairWithDistance]]:
+        return [createPairsWithDistance(self.referencesById[referenceId], self.queriesById[queryId],
+                                        referenceSiteIndices + 1, querySiteIds, reverseStrand)
+                for referenceSiteIndices, querySiteIds, queryId, referenceId, reverseStrand
+                in zip(*self._splitSimulationDetails(simulationDetails, reverseStrands), queryIds, referenceIds,
+                       reverseStrands)]
 
     def parse(self, simulationDetail: str, queryId: int, referenceId: int, reverseStrand: bool):
-        reference = next(r for r in self.references if r.moleculeId == referenceId)
-        query = next(q for q in self.queries if q.moleculeId == queryId)
+        reference = self.referencesById[referenceId]
+        query = self.queriesById[queryId]
 
         pairs = [pair for pairs in
                  [self.__parsePair(x, i + 1, reference, query) for i, x in enumerate(simulationDetail.split(";")) if x != "FP"]
@@ -1,7 +1,5 @@
 from typing import List, TextIO, Iterable
 
-from pandas import Series
-
 from src.correlation.simulated_alignment import SimulatedAlignment
 from src.diagnostic.benchmark_alignment import BenchmarkAlignment
 from src.parsers.bionano_file_reader import BionanoFileReader
@@ -22,16 +20,13 @@ class SimulationDataAsXmapReader:
         if queryIds:
             alignments = alignments[alignments["ID"].isin(queryIds)]
 
-        return alignments.apply(self.__rowParserFactory(), axis=1).tolist()
-
-    def __rowParserFactory(self):
-        def parseRow(row: Series):
-            queryId = int(row["ID"])
-            referenceId = int(row["Reference"])
-            reverseStrand = row["Strand"] == "-"
-            return SimulatedAlignment.parse(queryId, queryId, referenceId, 0,
-                                            row["Size"], row["Start"], row["Stop"], reverseStrand,
-                                            9999., "", row["Size"], row["Size"],
-                                            self.pairParser.parse(row["SimuInfoDetail"], queryId, referenceId, reverseStrand))
-
-        return parseRow
+        queryIds = alignments["ID"].astype(int).tolist()
+        referenceIds = alignments["Reference"].astype(int).tolist()
+        reverseStrands = (alignments["Strand"] == "-").tolist()
+        alignedPairs = self.pairParser.parseAll(alignments["SimuInfoDetail"].tolist(), queryIds, referenceIds,
+                                                reverseStrands)
+        return [SimulatedAlignment.parse(queryId, queryId, referenceId, 0, size, start, stop, reverseStrand, 9999., "",
+                                         size, size, pairs)
+                for queryId, referenceId, reverseStrand, start, stop, size, pairs
+                in zip(queryIds, referenceIds, reverseStrands, alignments["Start"].tolist(),
+                       alignments["Stop"].tolist(), alignments["Size"].tolist(), alignedPairs)]
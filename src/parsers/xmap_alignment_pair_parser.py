@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
 
 from src.correlation.optical_map import OpticalMap
 from src.diagnostic.benchmark_alignment import BenchmarkAlignedPair, BenchmarkAlignmentPosition, \
@@ -11,31 +14,69 @@ class BaseXmapAlignmentPairParser(ABC):
     def parse(self, alignment: str, queryId: int, referenceId: int, reverseStrand: bool):
         pass
 
+    def parseAll(self, alignments: Sequence[str], queryIds: Sequence[int], referenceIds: Sequence[int],
+                 reverseStrands: Sequence[bool]) -> List[List[BenchmarkAlignedPair]]:
+        """Parses alignment strings of many XMAP rows at once."""
+        return [self.parse(*row) for row in zip(alignments, queryIds, referenceIds, reverseStrands)]
+
+    @staticmethod
+    def _splitAlignments(alignments: Sequence[str]):
+        """Site ids of pairs of all alignments, extracted in bulk from strings such as (1,2)(3,4).
+
+        :return: reference site ids and query site ids of pairs of each alignment
+        """
+        matches = pd.Series(list(alignments), dtype=object).str.extractall(r"\((\d+),(\d+)\)")
+        rows = matches.index.get_level_values(0).to_numpy(dtype=int)
+        splits = np.cumsum(np.bincount(rows, minlength=len(alignments)))[:-1]
+        return (np.split(matches[0].to_numpy(dtype=int), splits),
+                np.split(matches[1].to_numpy(dtype=int), splits))
+
 
 class XmapAlignmentPairParser(BaseXmapAlignmentPairParser):
     def parse(self, alignment: str, queryId: int, referenceId: int, reverseStrand: bool):
         alignmentPairStrings = alignment[:-1].replace('(', '').split(')')
         return list(map(lambda pair: BenchmarkAlignedPair.create(*pair.split(',')), alignmentPairStrings))
 
+    def parseAll(self, alignments: Sequence[str], queryIds: Sequence[int], referenceIds: Sequence[int],
+                 reverseStrands: Sequence[bool]) -> List[List[BenchmarkAlignedPair]]:
+        return [[BenchmarkAlignedPair(BenchmarkAlignmentPosition(r, 0), BenchmarkAlignmentPosition(q, 0))
+                 for r, q in zip(referenceSiteIds.tolist(), querySiteIds.tolist())]
+                for referenceSiteIds, querySiteIds, _ in zip(*self._splitAlignments(alignments), queryIds)]
+
 
 class XmapAlignmentPairWithDistanceParser(BaseXmapAlignmentPairParser):
     def __init__(self, references: List[OpticalMap], queries: List[OpticalMap]):
         self.references = references
         self.queries = queries
+        self.referencesById = {r.moleculeId: r for r in reversed(references)}
+        self.queriesById = {q.moleculeId: q for q in reversed(queries)}
 
     def parse(self, alignment: str, queryId: int, referenceId: int, reverseStrand: bool):
         alignmentPairStrings = alignment[:-1].replace('(', '').split(')')
-        reference = next(r for r in self.references if r.moleculeId == referenceId)
-        query = next(q for q in self.queries if q.moleculeId == queryId)
-
-        def createAlignedPair(pair: str):
-            referenceSiteId, querySiteId = map(lambda siteId: int(siteId), pair.split(','))
-            referencePosition = BenchmarkAlignmentPosition(referenceSiteId, reference.positions[referenceSiteId - 1])
-            queryPosition = BenchmarkAlignmentPosition(querySiteId, query.positions[querySiteId - 1])
-            return BenchmarkAlignedPair(referencePosition, queryPosition)
-
-        alignedPairs = list(map(lambda pair: createAlignedPair(pair), alignmentPairStrings))
-        alignedPairsWithDistances = map(
-            lambda pair: BenchmarkAlignedPairWithDistance.calculateDistance(pair, alignedPairs[0], reverseStrand),
-            alignedPairs)
-        return list(alignedPairsWithDistances) if alignedPairs else []
+        referenceSiteIds, querySiteIds = zip(*(map(int, pair.split(',')) for pair in alignmentPairStrings))
+        return self.__createPairs(np.array(referenceSiteIds), np.array(querySiteIds), queryId, referenceId,
+                                  reverseStrand)
+
+    def parseAll(self, alignments: Sequence[str], queryIds: Sequence[int], referenceIds: Sequence[int],
+                 reverseStrands: Sequence[bool]) -> List[List[BenchmarkAlignedPairWithDistance]]:
+        return [self.__createPairs(*row) for row in zip(*self._splitAlignments(alignments), queryIds, referenceIds,
+                                                         reverseStrands)]
+
+    def __createPairs(self, referenceSiteIds: np.ndarray, querySiteIds: np.ndarray, queryId: int, referenceId: int,
+                      reverseStrand: bool):
+        return createPairsWithDistance(self.referencesById[referenceId], self.queriesById[queryId], referenceSiteIds,
+                                       querySiteIds, reverseStrand)
+
+
+def createPairsWithDistance(reference: OpticalMap, query: OpticalMap, referenceSiteIds: np.ndarray,
+                            querySiteIds: np.ndarray, reverseStrand: bool) -> List[BenchmarkAlignedPairWithDistance]:
+    """Pairs with distances relative to the first pair, as in BenchmarkAlignedPairWithDistance.calculateDistance."""
+    if not referenceSiteIds.size:
+        return []
+    referencePositions = reference.positions[referenceSiteIds - 1]
+    queryPositions = query.positions[querySiteIds - 1]
+    queryDifferences = queryPositions[0] - queryPositions if reverseStrand else queryPositions - queryPositions[0]
+    distances = queryDifferences - (referencePositions - referencePositions[0])
+    return [BenchmarkAlignedPairWithDistance(BenchmarkAlignmentPosition(r, rp), BenchmarkAlignmentPosition(q, qp), d)
+            for r, rp, q, qp, d in zip(referenceSiteIds.tolist(), referencePositions.tolist(), querySiteIds.tolist(),
+                                       queryPositions.tolist(), distances.tolist())]
@@ -0,0 +1,93 @@
+import csv
+import gzip
+import io
+import os.path
+import socket
+from io import TextIOWrapper
+from typing import TextIO, List
+
+from src.alignment.alignment_results import AlignmentResults, AlignmentResultRow
+from src.args import Args
+
+
+class XmapWriter:
+    """Writes alignment results in XMAP format, formatting each row straight into the file, so that the output is
+    never held in memory as a whole. Files with names ending with .gz are written gzip compressed.
+    """
+
+    def write(self, file: TextIO, alignmentResults: AlignmentResults, args: Args):
+        compressed = self.isCompressed(file)
+        output = TextIOWrapper(gzip.GzipFile(fileobj=file.buffer, mode="wb"), encoding=file.encoding) \
+            if compressed else file
+        withDegradedColumn = args.queryTimeBudget is not None
+        self.__writeHeaders(output, alignmentResults, args, withDegradedColumn)
+        csv.writer(output, delimiter="\t", lineterminator="\n").writerows(
+            self.__formatRow(entryId, row, withDegradedColumn)
+            for entryId, row in enumerate(alignmentResults.rows, start=1))
+        if compressed:
+            output.flush()
+            output.detach().close()
+        file.flush()
+
+    @staticmethod
+    def isCompressed(file: TextIO):
+        name = getattr(file, "name", None)
+        return isinstance(name, str) and name.endswith(".gz")
+
+    def __writeHeaders(self, file: TextIO, alignmentResults: AlignmentResults, args: Args, withDegradedColumn: bool):
+        columns = {
+            "#h": "#f",
+            "XmapEntryID": "int",
+            "QryContigID": "int",
+            "RefContigID": "int",
+            "QryStartPos": "float",
+            "QryEndPos": "float",
+            "RefStartPos": "float",
+            "RefEndPos": "float",
+            "Orientation": "string",
+            "Confidence": "float",
+            "HitEnum": "string",
+            "QryLen": "float",
+            "RefLen": "float",
+            "AlignedRest": "string",
+            **({"Degraded": "string"} if withDegradedColumn else {}),
+            "LabelChannel": "int",
+            "Alignment": "string"
+        }
+        file.writelines(line + "\n" for line in [
+            f"# hostname={socket.gethostname()}",
+            "# coma " + " ".join([f"--{k} {self.__argToString(v)}" for k, v in vars(args).items()]),
+            "# XMAP File Version:\t0.2",
+            f"# Reference Maps From:\t{os.path.abspath(alignmentResults.referenceFilePath)}",
+            f"# Query Maps From:\t{os.path.abspath(alignmentResults.queryFilePath)}",
+            "\t".join([columnName for columnName in columns.keys()]),
+            "\t".join([columnType for columnType in columns.values()])])
+
+    @staticmethod
+    def __formatRow(entryId: int, row: AlignmentResultRow, withDegradedColumn: bool) -> List:
+        return [
+            entryId,
+            row.queryId,
+            row.referenceId,
+            "{:.1f}".format(row.queryStartPosition),
+            "{:.1f}".format(row.queryEndPosition),
+            "{:.1f}".format(row.referenceStartPosition),
+            "{:.1f}".format(row.referenceEndPosition),
+            row.orientation,
+            "{:.2f}".format(row.confidence),
+            row.cigarString,
+            "{:.1f}".format(row.queryLength),
+            "{:.1f}".format(row.referenceLength),
+            "{}".format(row.alignedRest),
+            *(["{}".format(row.degraded)] if withDegradedColumn else []),
+            1,
+            row.alignmentString
+        ]
+
+    @staticmethod
+    def __argToString(arg):
+        if isinstance(arg, io.TextIOWrapper):
+            return arg.name
+        if isinstance(arg, list):
+            return " ".join(str(a) for a in arg)
+        return str(arg)
@@ -9,7 +9,7 @@ from src.diagnostic.diagnostics import DiagnosticsWriter, PrimaryCorrelationPlot
     SecondaryCorrelationPlotter, AlignmentPlotter, MultipleAlignmentsPlotter
 from src.extensions.dispatcher import Dispatcher
 from src.extensions.extension import Extension
-from src.parsers.alignment_benchmark_reader import AlignmentBenchmarkReader
+from src.parsers.alignment_benchmark_reader import AlignmentBenchmarkReader, AlignmentBenchmarkIndex
 from src.parsers.cmap_reader import CmapReader
 from src.parsers.simulation_alignment_pair_parser import SimulationAlignmentPairWithDistanceParser
 from src.parsers.simulation_data_as_xmap_reader import SimulationDataAsXmapReader
@@ -35,23 +35,40 @@ class Program:
             simulationDataReader = SimulationDataAsXmapReader(
                 SimulationAlignmentPairWithDistanceParser(self.referenceMaps, self.queryMaps))
             benchmarkReader = AlignmentBenchmarkReader(self.xmapReader, simulationDataReader)
+            benchmarkIndex = self.__readBenchmarkAlignments(benchmarkReader) if args.benchmarkAlignmentFile else None
             self.dispatcher.addExtension(PrimaryCorrelationPlotter(writer))
             self.dispatcher.addExtension(SecondaryCorrelationPlotter(writer))
-            self.dispatcher.addExtension(AlignmentPlotter(writer, benchmarkReader, args.benchmarkAlignmentFile))
-            self.dispatcher.addExtension(
-                MultipleAlignmentsPlotter(writer, benchmarkReader, args.benchmarkAlignmentFile))
+            self.dispatcher.addExtension(AlignmentPlotter(writer, benchmarkIndex))
+            self.dispatcher.addExtension(MultipleAlignmentsPlotter(writer, benchmarkIndex))
 
     def run(self):
-        alignmentResultRows = self.workflowCoordinator.execute(self.referenceMaps, self.queryMaps)
+        try:
+            alignmentResultRows = self.workflowCoordinator.execute(self.referenceMaps, self.queryMaps)
+        finally:
+            self.workflowCoordinator.close()
         alignmentResult = AlignmentResults.create(self.args.referenceFile.name, self.args.queryFile.name,
                                                   alignmentResultRows)
         self.xmapReader.writeAlignments(self.args.outputFile, alignmentResult, self.args)
         if self.args.outputFile is not sys.stdout:
             self.args.outputFile.close()
+        if self.args.queryTimeBudget is not None:
+            self.__reportDegradedQueries()
         return alignmentResult
 
+    def __reportDegradedQueries(self):
+        degradedQueryIds = sorted(self.workflowCoordinator.degradedQueryIds)
+        print(f"Queries aligned in degraded mode after exceeding the time budget of {self.args.queryTimeBudget} s: "
+              f"{len(degradedQueryIds)}", file=sys.stderr)
+        if degradedQueryIds:
+            print(" ".join(map(str, degradedQueryIds)), file=sys.stderr)
+
+    def __readBenchmarkAlignments(self, benchmarkReader: AlignmentBenchmarkReader):
+        with self.args.benchmarkAlignmentFile:
+            return AlignmentBenchmarkIndex.read(benchmarkReader, self.args.benchmarkAlignmentFile,
+                                                [q.moleculeId for q in self.queryMaps])
+
     def __readMaps(self):
-        cmapReader = CmapReader()
+        cmapReader = CmapReader(useCache=self.args.cmapCache)
         with self.args.referenceFile:
             self.referenceMaps = cmapReader.readReferences(self.args.referenceFile, self.args.referenceIds)
         with self.args.queryFile:
@@ -1,65 +1,164 @@
 from __future__ import annotations
 
+import sys
 from itertools import chain
-from typing import List, Iterator
-
-from p_tqdm import p_imap
+from typing import List, Iterator, NamedTuple, Tuple, Dict, Set
 
 from src.alignment.aligner import Aligner
 from src.alignment.alignment_results import AlignmentResultRow
 from src.args import Args
 from src.correlation.optical_map import OpticalMap, InitialAlignment, CorrelationResult
+from src.correlation.peak_candidates import PeakCandidates
 from src.correlation.peaks_selector import PeaksSelector, SelectedPeak
 from src.correlation.sequence_generator import SequenceGenerator
+from src.execution.deadline import Deadline
+from src.execution.executors import Executor
+from src.execution.pipeline import Pipeline, PipelineStage
 from src.extensions.dispatcher import Dispatcher
 from src.extensions.messages import CorrelationResultMessage, InitialAlignmentMessage, AlignmentResultRowMessage, \
     MultipleAlignmentResultRowsMessage
 
 
+class ReferenceRegion(NamedTuple):
+    referenceId: int
+    start: int = 0
+    end: int | None = None
+    reverseStrand: bool | None = None
+
+
+class AlignmentSearch(NamedTuple):
+    referenceRegions: List[ReferenceRegion]
+    query: OpticalMap
+    peakCandidates: PeakCandidates | None = None
+
+
+class _AlignmentState(NamedTuple):
+    search: AlignmentSearch
+    peakCandidates: PeakCandidates
+    selectedPeaks: List[SelectedPeak]
+    secondaryCorrelations: List[Tuple[InitialAlignment, CorrelationResult]]
+    alignments: List[Tuple[AlignmentResultRow, AlignmentResultRowMessage]]
+    deadline: Deadline
+    degraded: bool = False
+
+
 class _WorkflowCoordinator:
     def __init__(self, args: Args, primaryGenerator: SequenceGenerator, secondaryGenerator: SequenceGenerator,
-                 aligner: Aligner, dispatcher: Dispatcher, peaksSelector: PeaksSelector):
+                 aligner: Aligner, dispatcher: Dispatcher, peaksSelector: PeaksSelector, executor: Executor):
         self.args = args
         self.primaryGenerator = primaryGenerator
         self.secondaryGenerator = secondaryGenerator
         self.aligner = aligner
         self.dispatcher = dispatcher
         self.peaksSelector = peaksSelector
+        self.executor = executor
+        self.peakCandidates: Dict[int, PeakCandidates] = {}
+        self.referenceMaps: Dict[int, OpticalMap] = {}
+        self.degradedQueryIds: Set[int] = set()
 
     def execute(self, referenceMaps: List[OpticalMap], queryMaps: List[OpticalMap]) -> List[AlignmentResultRow]:
-        return [a for a in p_imap(
-            lambda x: self.__align(*x),
-            list((referenceMaps, q) for q in queryMaps),
-            num_cpus=self.args.numberOfCpus,
-            disable=self.args.disableProgressBar)
-                if a is not None and a.alignedPairs]
-
-    def __align(self, referenceMaps: List[OpticalMap], queryMap: OpticalMap) -> AlignmentResultRow | None:
-        primaryCorrelations = chain.from_iterable(self.__getPrimaryCorrelations(r, queryMap) for r in referenceMaps)
-
-        bestPrimaryCorrelationPeaks = self.peaksSelector.selectPeaks(primaryCorrelations)
-
-        secondaryCorrelations = [self.__getSecondaryCorrelation(p, i)
-                                 for i, p in enumerate(bestPrimaryCorrelationPeaks)]
-
-        alignmentResultRows, messages = zip(*[self.__getAlignmentRow(pc, sc, i) for i, (pc, sc) in
-                                              enumerate(secondaryCorrelations)])
+        # worker processes keep a copy of the coordinator from when they started, so they are restarted with the maps
+        self.executor.close()
+        self.referenceMaps = {r.moleculeId: r for r in referenceMaps}
+        referenceRegions = [ReferenceRegion(r.moleculeId) for r in referenceMaps]
+        return self.executeSearches([AlignmentSearch(referenceRegions, q) for q in queryMaps])
+
+    def close(self):
+        self.executor.close()
+
+    def executeSearches(self, searches: List[AlignmentSearch]) -> List[AlignmentResultRow]:
+        """Aligns queries of all searches. Primary correlation peaks of searches which had to be seeded are kept in
+        peakCandidates by query id.
+        """
+        alignmentResultRows = []
+        for (alignmentResultRow, peakCandidates), search in zip(self.__imap(searches), searches):
+            if search.peakCandidates is None:
+                self.peakCandidates[search.query.moleculeId] = peakCandidates
+            if alignmentResultRow is not None and alignmentResultRow.degraded:
+                self.degradedQueryIds.add(search.query.moleculeId)
+            if alignmentResultRow is not None and alignmentResultRow.alignedPairs:
+                alignmentResultRows.append(alignmentResultRow)
+        return alignmentResultRows
+
+    def __imap(self, searches: List[AlignmentSearch]) -> Iterator[Tuple[AlignmentResultRow | None, PeakCandidates]]:
+        if not self.args.pipelineWorkers:
+            return self.executor.imap(self.__align, searches)
+        return self.__imapPipelined(searches)
+
+    def __imapPipelined(self, searches: List[AlignmentSearch]):
+        seedWorkers, refineWorkers, alignWorkers = self.args.pipelineWorkers
+        processStages = self.args.pipelineProcessStages
+        pipeline = Pipeline([PipelineStage("seed", self.__seed, seedWorkers, "seed" in processStages),
+                             PipelineStage("refine", self.__refine, refineWorkers, "refine" in processStages),
+                             PipelineStage("align", self.__alignAndCollect, alignWorkers, "align" in processStages)],
+                            disableProgressBar=self.args.disableProgressBar, processExecutor=self.executor)
+        yield from pipeline.imap(searches)
+        if self.args.pipelineStatistics:
+            print(pipeline.formatStatistics(), file=sys.stderr)
+
+    def __align(self, search: AlignmentSearch) -> Tuple[AlignmentResultRow | None, PeakCandidates]:
+        return self.__alignAndCollect(self.__refine(self.__seed(search)))
+
+    def __alignAndCollect(self, state: _AlignmentState) -> Tuple[AlignmentResultRow | None, PeakCandidates]:
+        """Last step of the alignment, which returns only the result, without correlations of the state."""
+        return self.__collect(self.__alignPeaks(state))
+
+    def __seed(self, search: AlignmentSearch) -> _AlignmentState:
+        deadline = Deadline.start(self.args.queryTimeBudget)
+        if search.peakCandidates is None:
+            primaryCorrelations = list(chain.from_iterable(
+                self.__getPrimaryCorrelations(r, search.query) for r in search.referenceRegions))
+            peakCandidates = PeakCandidates.create(search.query, primaryCorrelations)
+        else:
+            peakCandidates = search.peakCandidates
+            primaryCorrelations = list(chain.from_iterable(
+                peakCandidates.getInitialAlignments(search.query, self.referenceMaps[r.referenceId],
+                                                    self.primaryGenerator.resolution,
+                                                    self.primaryGenerator.blurRadius, r.start, r.end, r.reverseStrand)
+                for r in search.referenceRegions))
+
+        return _AlignmentState(search, peakCandidates, self.peaksSelector.selectPeaks(primaryCorrelations),
+                               secondaryCorrelations=[], alignments=[], deadline=deadline)
+
+    def __refine(self, state: _AlignmentState) -> _AlignmentState:
+        secondaryCorrelations, allPeaksRefined = state.deadline.map(
+            lambda i: self.__getSecondaryCorrelation(state.selectedPeaks[i], i), range(len(state.selectedPeaks)))
+        return state._replace(selectedPeaks=[],
+                              secondaryCorrelations=secondaryCorrelations,
+                              degraded=state.degraded or not allPeaksRefined)
+
+    def __alignPeaks(self, state: _AlignmentState) -> _AlignmentState:
+        alignments, allPeaksAligned = state.deadline.map(
+            lambda i: self.__getAlignmentRow(*state.secondaryCorrelations[i], i, state.deadline),
+            range(len(state.secondaryCorrelations)))
+        return state._replace(secondaryCorrelations=[],
+                              alignments=alignments,
+                              degraded=state.degraded or not allPeaksAligned)
+
+    def __collect(self, state: _AlignmentState) -> Tuple[AlignmentResultRow | None, PeakCandidates]:
+        if not state.alignments:
+            return None, state.peakCandidates
+
+        alignmentResultRows, messages = zip(*state.alignments)
         self.dispatcher.dispatch(MultipleAlignmentResultRowsMessage(messages))
-        return self.__getBestAlignment(alignmentResultRows)
-
-    def __getPrimaryCorrelations(self, referenceMap: OpticalMap, queryMap: OpticalMap) -> Iterator[InitialAlignment]:
-        primaryCorrelation = queryMap.getInitialAlignment(referenceMap, self.primaryGenerator,
-                                                          self.args.minPeakDistance, self.args.peaksCount)
+        bestAlignment = self.__getBestAlignment(alignmentResultRows)
+        if state.degraded:
+            bestAlignment.setDegraded(True)
+        return bestAlignment, state.peakCandidates
+
+    def __getPrimaryCorrelations(self, referenceRegion: ReferenceRegion, queryMap: OpticalMap) \
+            -> Iterator[InitialAlignment]:
+        strands = [False, True] if referenceRegion.reverseStrand is None else [referenceRegion.reverseStrand]
+        primaryCorrelations = [self.__getPrimaryCorrelation(referenceRegion, queryMap, reverseStrand)
+                               for reverseStrand in strands]
+        return (c for c in primaryCorrelations if any(c.peaks))
+
+    def __getPrimaryCorrelation(self, referenceRegion: ReferenceRegion, queryMap: OpticalMap, reverseStrand: bool):
+        primaryCorrelation = queryMap.getInitialAlignment(
+            self.referenceMaps[referenceRegion.referenceId], self.primaryGenerator, self.args.minPeakDistance,
+            self.args.peaksCount, reverseStrand, referenceRegion.start, referenceRegion.end)
         self.dispatcher.dispatch(InitialAlignmentMessage(primaryCorrelation))
-
-        primaryCorrelationReverse = queryMap.getInitialAlignment(
-            referenceMap, self.primaryGenerator, self.args.minPeakDistance, self.args.peaksCount, reverseStrand=True)
-
-        self.dispatcher.dispatch(InitialAlignmentMessage(primaryCorrelationReverse))
-        if any(primaryCorrelation.peaks):
-            yield primaryCorrelation
-        if any(primaryCorrelationReverse.peaks):
-            yield primaryCorrelationReverse
+        return primaryCorrelation
 
     def __getSecondaryCorrelation(self, selectedPeak: SelectedPeak, index: int):
         secondaryCorrelation = selectedPeak.primaryCorrelation.refine(selectedPeak.peak.position,
@@ -70,8 +169,8 @@ class _WorkflowCoordinator:
         self.dispatcher.dispatch(CorrelationResultMessage(selectedPeak.primaryCorrelation, secondaryCorrelation, index))
         return selectedPeak.primaryCorrelation, secondaryCorrelation
 
-    def __getAlignmentRow(self, ic: InitialAlignment, sc: CorrelationResult, index: int):
-        alignmentResultRow = self.aligner.align(sc.reference, sc.query, sc.peaks, sc.reverseStrand)
+    def __getAlignmentRow(self, ic: InitialAlignment, sc: CorrelationResult, index: int, deadline: Deadline):
+        alignmentResultRow = self.aligner.align(sc.reference, sc.query, sc.peaks, sc.reverseStrand, deadline)
         message = AlignmentResultRowMessage(sc.reference, sc.query, alignmentResultRow, ic, index)
         self.dispatcher.dispatch(message)
         return alignmentResultRow, message
@@ -1,11 +1,13 @@
 from src.alignment.aligner import AlignerEngine, Aligner
 from src.alignment.alignment_position_scorer import AlignmentPositionScorer
+from src.alignment.banded_aligner import BandedAligner
 from src.alignment.segment_chainer import SegmentChainer, SequentialityScorer
 from src.alignment.segment_with_resolved_conflicts import AlignmentSegmentConflictResolver
 from src.alignment.segments_factory import AlignmentSegmentsFactory
 from src.args import Args
 from src.correlation.peaks_selector import PeaksSelector
 from src.correlation.sequence_generator import SequenceGenerator
+from src.execution.executors import Executor, ThreadExecutor, SerialExecutor, ProcessExecutor
 from src.extensions.dispatcher import Dispatcher
 from src.multi_pass_workflow_coordinator import _MultiPassWorkflowCoordinator
 from src.parsers.xmap_reader import XmapReader
@@ -29,15 +31,18 @@ class WorkflowCoordinatorFactory:
         alignerEngine = AlignerEngine(self.args.maxPairDistance)
         alignmentSegmentConflictResolver = AlignmentSegmentConflictResolver(
             SegmentChainer(
-                SequentialityScorer(self.args.segmentJoinMultiplier, self.args.sequentialityScore)))
-        aligner = Aligner(scorer, segmentsFactory, alignerEngine, alignmentSegmentConflictResolver)
+                SequentialityScorer(self.args.segmentJoinMultiplier, self.args.sequentialityScore),
+                self.args.chainBand))
+        aligner = Aligner(scorer, segmentsFactory, alignerEngine, alignmentSegmentConflictResolver) \
+            if self.args.alignEngine == "segments" else BandedAligner(scorer, alignerEngine, self.args.minScore)
         if self.args.outputMode == "single":
             return _WorkflowCoordinator(
                 self.args, primaryGenerator,
                 secondaryGenerator,
                 aligner,
                 self.dispatcher,
-                PeaksSelector(self.args.peaksCount))
+                PeaksSelector(self.args.peaksCount),
+                self.__createExecutor())
         else:
             return _MultiPassWorkflowCoordinator(
                 self.args,
@@ -46,4 +51,14 @@ class WorkflowCoordinatorFactory:
                 aligner,
                 self.dispatcher,
                 PeaksSelector(self.args.peaksCount),
+                self.__createExecutor(),
                 self.xmapReader)
+
+    def __createExecutor(self) -> Executor:
+        if self.args.pipelineWorkers:
+            return ProcessExecutor(self.args.numberOfCpus, self.args.disableProgressBar)
+        if self.args.executor == "thread":
+            return ThreadExecutor(self.args.numberOfCpus, self.args.disableProgressBar)
+        if self.args.executor == "serial":
+            return SerialExecutor(self.args.numberOfCpus, self.args.disableProgressBar)
+        return ProcessExecutor(self.args.numberOfCpus, self.args.disableProgressBar)
@@ -4,7 +4,7 @@ from unittest.mock import Mock
 import pytest
 
 from src.alignment.aligner import Aligner, AlignerEngine
-from src.alignment.alignment_position import AlignedPair, AlignmentPosition
+from src.alignment.alignment_position import AlignedPair, AlignmentPosition, NotAlignedReferencePosition
 from src.alignment.alignment_position_scorer import AlignmentPositionScorer
 from src.alignment.segment_with_resolved_conflicts import AlignmentSegmentConflictResolver, \
     AlignmentSegmentsWithResolvedConflicts
@@ -12,6 +12,7 @@ from src.alignment.segments import AlignmentSegment
 from src.alignment.segments_factory import AlignmentSegmentsFactory
 from src.correlation.optical_map import OpticalMap
 from src.correlation.peak import Peak
+from src.execution.deadline import Deadline
 
 
 def getSut(maxDistance=0):
@@ -225,5 +226,42 @@ def test_multiplePeaks():
     assert result.segments[1].positions == [(None, 1), (None, 2), (3, 3), (4, 4)]
 
 
+def test_alignerEngine_pairsPositionsWithinMaxDistanceOfReferenceWindow():
+    reference = OpticalMap(1, length=200, positions=[0, 30, 52, 60, 75, 101, 130, 160, 199])
+    query = OpticalMap(2, length=100, positions=[1, 10, 22, 29, 45, 58, 70, 99])
+    maxDistance = 6
+    peakPosition = 50
+
+    positions = AlignerEngine(maxDistance).align(reference, query, peakPosition, peakPosition + query.length, False)
+
+    referenceWithinWindow = [(i, r) for i, r in enumerate(reference.positions, 1)
+                             if peakPosition - maxDistance <= r <= peakPosition + query.length + maxDistance]
+    candidates = {(i, j) for i, r in referenceWithinWindow for j, q in enumerate(query.positions, 1)
+                  if abs(q - (r - peakPosition)) <= maxDistance}
+    alignedPairs = [(p.reference.siteId, p.query.siteId) for p in positions if isinstance(p, AlignedPair)]
+    assert alignedPairs == [(3, 1), (4, 2), (5, 3), (6, 5)]
+    assert set(alignedPairs) <= candidates
+    assert [p.reference.siteId for p in positions if isinstance(p, NotAlignedReferencePosition)] == [7]
+
+
+def test_multiplePeaks_withinDeadline_notDegraded():
+    reference = OpticalMap(1, length=111, positions=[0, 4, 100, 110])
+    query = OpticalMap(1, length=61, positions=[0, 4, 50, 60])
+    result = getSut().align(reference, query, [__peak(0), __peak(50)], deadline=Deadline.start(60))
+
+    assert len(result.segments) == 2
+    assert not result.degraded
+
+
+def test_multiplePeaks_afterDeadline_alignsFirstPeakOnlyAndMarksDegraded():
+    reference = OpticalMap(1, length=111, positions=[0, 4, 100, 110])
+    query = OpticalMap(1, length=61, positions=[0, 4, 50, 60])
+    result = getSut().align(reference, query, [__peak(0), __peak(50)], deadline=Deadline(0.))
+
+    assert len(result.segments) == 1
+    assert result.segments[0].positions == [(1, 1), (2, 2), (None, 3), (None, 4)]
+    assert result.degraded
+
+
 if __name__ == '__main__':
     pytest.main(args=[__file__])
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import pickle
+
 import pytest
 
-from src.alignment.alignment_position import NotAlignedPosition, NotAlignedQueryPosition, NotAlignedReferencePosition
+from src.alignment.alignment_position import AlignedPair, NotAlignedPosition, NotAlignedQueryPosition, NotAlignedReferencePosition, \
+    ScoredAlignedPair
 from src.correlation.optical_map import PositionWithSiteId
 from tests.test_doubles.alignment_segment_stub import AlignedPairStub
 
@@ -30,5 +33,32 @@ def test_score_alignedPair_distancePenalty():
     assert position.getScoredPosition(perfectMatchScore, distancePenaltyMultiplier, -123).score == 25
 
 
+def test_deduplicate_keepsClosestPairForEachReferenceAndQuerySite():
+    pairs = [AlignedPairStub(1, 1, 5), AlignedPairStub(1, 2, -3), AlignedPairStub(2, 2, 1),
+             AlignedPairStub(3, 3, -2), AlignedPairStub(3, 4, 2), AlignedPairStub(4, 4, 4)]
+
+    deduplicated = AlignedPair.deduplicate(pairs)
+
+    assert deduplicated == [(1, 1), (2, 2), (3, 3)]
+    assert [p.queryShift for p in deduplicated] == [5, 1, -2]
+
+
+def test_deduplicate_keepsFirstOfEquallyClosePairs():
+    first = AlignedPairStub(2, 1, -1)
+    pairs = [AlignedPairStub(1, 1, 4), first, AlignedPairStub(3, 1, 1)]
+
+    assert AlignedPair.deduplicate(pairs)[0] is first
+
+
+def test_scoredAlignedPair_survivesPickling():
+    pair = ScoredAlignedPair(AlignedPair(PositionWithSiteId(1, 100.), PositionWithSiteId(2, 105.), 5., 3), 95.)
+
+    copy = pickle.loads(pickle.dumps(pair))
+
+    assert not hasattr(copy, "__dict__")
+    assert copy == pair
+    assert (copy.queryShift, copy.source, copy.score) == (5., 3, 95.)
+
+
 if __name__ == '__main__':
     pytest.main(args=[__file__])
@@ -23,6 +23,9 @@ from tests.test_doubles.alignment_segment_stub import AlignmentSegmentStub
     ([(1, 3), (2, 1)], "1M1I1M"),
     ([(1, 1), (2, 4)], "1M2I1M"),
     ([(1, 1), (3, 3)], "1M1I1D1M"),
+    ([(1, 1)], ""),
+    ([(1, 1), (2, 2), (2, 3), (5, 4)], "2M"),
+    ([(1, 5), (2, 3), (4, 2), (3, 1)], "1M1I1M1D"),
     ([(22904, 1), (22905, 2), (22906, 3), (22907, 4), (22908, 5), (22909, 6), (22910, 7), (22911, 8), (22912, 9),
       (22913, 10), (22914, 11), (22915, 12), (22916, 13), (22917, 14), (22918, 15), (22920, 15), (22921, 16),
       (22922, 17), (22923, 17), (22924, 18), (22925, 19), (22926, 20), (22927, 21), (22928, 22), (22929, 23),
@@ -61,6 +64,21 @@ def test_cigarString(pairs: List[Tuple[int, int]], expected: str):
     assert row.cigarString == expected
 
 
+def test_alignmentString():
+    row = AlignmentResultRow([AlignmentSegmentStub.createFromPairs([(1, 1), (2, 3)]),
+                              AlignmentSegmentStub.createFromPairs([(4, 4)])])
+
+    assert row.alignmentString == "(1,1)(2,3)(4,4)"
+
+
+def test_derivedViewsAreComputedOnce():
+    row = AlignmentResultRow([AlignmentSegmentStub.createFromPairs([(1, 1), (2, 3)])])
+
+    assert row.alignedPairs is row.alignedPairs
+    assert row.positions is row.positions
+    assert row.notAlignedPositions is row.notAlignedPositions
+
+
 def test_filtersOutSubsequentAlignmentsOfOneQuery():
     alignmentResults = AlignmentResults.create('', '', [
         AlignmentResultRow([], queryId=20, referenceId=10, confidence=200),
@@ -94,9 +112,9 @@ def test_getUnalignedFragments(
         queryLength=queryLength,
         reverseStrand=reverse)
 
-    fragments = row.getUnalignedFragments(queries)
+    fragments = row.getUnalignedFragments({q.moleculeId: q for q in queries})
     assert len(fragments) == expectedOutputLength
-    assert fragments[0].positions == expectedPositions
+    assert fragments[0].positions.tolist() == expectedPositions
 
 
 @pytest.mark.parametrize(
@@ -115,9 +133,26 @@ def test_getUnalignedFragments_empty(
         queryLength=queryLength,
         reverseStrand=reverse)
 
-    fragments = row.getUnalignedFragments(queries)
+    fragments = row.getUnalignedFragments({q.moleculeId: q for q in queries})
     assert len(fragments) == 0
 
 
+def test_getUnalignedFragments_locatesAlignmentBySiteIds():
+    query = OpticalMap(1, 200, [0, 1, 5, 10, 20, 30, 100, 120, 130, 140, 150, 160])
+    row = AlignmentResultRow(
+        [AlignmentSegmentStub.createFromPairs([(20, 5), (21, 6)])],
+        queryId=1,
+        queryStartPosition=20.5,
+        queryEndPosition=30.5,
+        queryLength=200,
+        queryStartSiteId=5,
+        queryEndSiteId=6)
+
+    fragments = row.getUnalignedFragments({1: query})
+
+    assert [f.positions.tolist() for f in fragments] == [query.positions[:7].tolist(), query.positions[3:].tolist()]
+    assert fragments[1].shift == 3
+
+
 if __name__ == '__main__':
     pytest.main(args=[__file__])
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from src.alignment.aligner import AlignerEngine
+from src.alignment.alignment_position import AlignedPair, NotAlignedReferencePosition, NotAlignedQueryPosition, \
+    ScoredAlignedPair, ScoredNotAlignedPosition
+from src.alignment.alignment_position_scorer import AlignmentPositionScorer
+from src.alignment.alignment_table import AlignmentTable, AlignmentPositionKind
+from src.alignment.segments_factory import AlignmentSegmentsFactory
+from src.correlation.optical_map import OpticalMap
+from src.correlation.peak import Peak
+
+reference = OpticalMap(1, length=300, positions=[0, 30, 52, 60, 75, 101, 130, 160, 199, 250])
+query = OpticalMap(2, length=150, positions=[1, 10, 22, 29, 45, 58, 70, 99, 125, 149])
+
+
+def __table(peakPosition: int = 50, isReverse: bool = False):
+    return AlignerEngine(6).alignTable(reference, query, peakPosition, peakPosition + query.length, isReverse)
+
+
+def test_create_sortsPositionsByAbsolutePosition():
+    table = AlignmentTable.create(np.array([1, 2, 3]), np.array([10, 20, 30]), np.array([1, 2]), np.array([3, 15]),
+                                  np.array([1]), np.array([1]), np.array([-5]), 2)
+
+    assert table.kinds.tolist() == [AlignmentPositionKind.NOT_ALIGNED_QUERY,
+                                    AlignmentPositionKind.NOT_ALIGNED_REFERENCE,
+                                    AlignmentPositionKind.ALIGNED_PAIR,
+                                    AlignmentPositionKind.NOT_ALIGNED_REFERENCE]
+    assert list(table) == [(None, 1), (1, None), (2, 2, -5), (3, None)]
+
+
+def test_views_areCreatedOnceAndMatchColumns():
+    table = __table()
+
+    assert table[0] is table[0]
+    assert table[1:3] == [table[1], table[2]]
+    assert table[-1] is table[len(table) - 1]
+    for position, kind in zip(table, table.kinds):
+        assert isinstance(position, {AlignmentPositionKind.ALIGNED_PAIR: AlignedPair,
+                                     AlignmentPositionKind.NOT_ALIGNED_REFERENCE: NotAlignedReferencePosition,
+                                     AlignmentPositionKind.NOT_ALIGNED_QUERY: NotAlignedQueryPosition}[kind])
+
+
+@pytest.mark.parametrize("isReverse", [False, True])
+def test_engine_alignAndAlignTable_returnSamePositions(isReverse):
+    table = __table(isReverse=isReverse)
+    positions = AlignerEngine(6).align(reference, query, 50, 50 + query.length, isReverse)
+
+    assert list(table) == positions
+    assert [p.absolutePosition for p in table] == [p.absolutePosition for p in positions]
+    assert [p.queryShift for p in table if isinstance(p, AlignedPair)] == \
+           [p.queryShift for p in positions if isinstance(p, AlignedPair)]
+
+
+def test_scorer_scoresTableAsPositions():
+    scorer = AlignmentPositionScorer(100, 1.5, -20)
+    table = __table()
+
+    scoredTable = scorer.getScoredTable(table)
+    scoredPositions = scorer.getScoredPositions(list(table))
+
+    assert scoredTable.scores.tolist() == [p.score for p in scoredPositions]
+    assert all(isinstance(p, (ScoredAlignedPair, ScoredNotAlignedPosition)) for p in scoredTable)
+    assert table.scores is None
+
+
+def test_scorer_getScores_ofPositionsAndTableAreAlignedWithPositions():
+    scorer = AlignmentPositionScorer(100, 1.5, -20)
+    table = __table(isReverse=True)
+    positions = list(table)
+
+    expected = [p.score for p in scorer.getScoredPositions(positions)]
+    assert scorer.getScores(positions).tolist() == expected
+    assert scorer.getScores(table).tolist() == expected
+    assert scorer.getScores([]).size == 0
+
+
+def test_scorer_positiveUnmatchedPenalty_raises():
+    with pytest.raises(ValueError):
+        AlignmentPositionScorer(100, 1, 20).getScoredTable(__table())
+
+
+def test_segmentsFactory_tableAndPositionsGiveSameSegments():
+    scorer = AlignmentPositionScorer(100, 1, -20)
+    factory = AlignmentSegmentsFactory(50, 150)
+    scoredTable = scorer.getScoredTable(__table())
+    peak = Peak(50, 1)
+
+    fromTable = factory.getSegments(scoredTable, peak)
+    fromPositions = factory.getSegments(scorer.getScoredPositions(list(__table())), peak)
+
+    assert [repr(s) for s in fromTable] == [repr(s) for s in fromPositions]
+    assert fromTable[0].allPeakPositions is scoredTable
+
+
+if __name__ == '__main__':
+    pytest.main(args=[__file__])
@@ -0,0 +1,113 @@
+import pytest
+
+from src.alignment.aligner import AlignerEngine
+from src.alignment.alignment_position_scorer import AlignmentPositionScorer
+from src.alignment.banded_aligner import BandedAligner
+from src.correlation.optical_map import OpticalMap
+from src.correlation.peak import Peak
+from src.execution.deadline import Deadline
+
+
+def getSut(maxDistance=10, unmatchedPenalty=-20, minScore=0):
+    return BandedAligner(AlignmentPositionScorer(100, 1, unmatchedPenalty), AlignerEngine(maxDistance), minScore)
+
+
+def __peak(position: int = 0):
+    return Peak(position, 100)
+
+
+def test_perfectMatch():
+    reference = OpticalMap(1, length=300, positions=[100, 150, 200])
+    query = OpticalMap(2, length=101, positions=[0, 50, 100])
+
+    result = getSut().align(reference, query, __peak(100))
+
+    assert result.alignedPairs == [(1, 1), (2, 2), (3, 3)]
+    assert result.confidence == 300
+
+
+def test_perfectMatch_reverseStrand():
+    reference = OpticalMap(1, length=91, positions=[0, 40, 90])
+    query = OpticalMap(2, length=91, positions=[0, 50, 90])
+
+    result = getSut().align(reference, query, __peak(), True)
+
+    assert result.alignedPairs == [(1, 3), (2, 2), (3, 1)]
+
+
+def test_getSegment_reverseStrand():
+    reference = OpticalMap(1, length=91, positions=[0, 40, 90])
+    query = OpticalMap(2, length=91, positions=[0, 50, 90])
+
+    segment = getSut().getSegment(True, __peak(), query, reference)
+
+    assert [(p.reference.siteId, p.query.siteId) for p in segment.positions] == [(1, 3), (2, 2), (3, 1)]
+
+
+def test_skipsNoisySite_whenUnmatchedPenaltyIsLowerThanPairScore():
+    reference = OpticalMap(1, length=300, positions=[100, 148, 152, 200])
+    query = OpticalMap(2, length=101, positions=[0, 50, 100])
+
+    result = getSut().align(reference, query, __peak(100))
+
+    assert result.alignedPairs == [(1, 1), (2, 2), (4, 3)]
+    assert result.confidence == 100 + 98 - 20 + 100
+
+
+def test_keepsPairsIncreasingOnBothSequences():
+    reference = OpticalMap(1, length=300, positions=[100, 145, 155, 200])
+    query = OpticalMap(2, length=101, positions=[0, 46, 54, 100])
+
+    result = getSut().align(reference, query, __peak(100))
+
+    assert result.alignedPairs == [(1, 1), (2, 2), (3, 3), (4, 4)]
+
+
+def test_breaksChain_whenSkippedSitesCostMoreThanTheyJoin():
+    reference = OpticalMap(1, length=400, positions=[100, 110, 200, 210, 220, 230, 240, 250, 300])
+    query = OpticalMap(2, length=201, positions=[0, 10, 200])
+
+    result = getSut(unmatchedPenalty=-50).align(reference, query, __peak(100))
+
+    assert result.alignedPairs == [(1, 1), (2, 2)]
+
+
+def test_returnsBestAlignmentOfAllPeaks():
+    reference = OpticalMap(1, length=1000, positions=[100, 150, 200, 600, 650, 700])
+    query = OpticalMap(2, length=101, positions=[0, 50, 100])
+
+    result = getSut().align(reference, query, [__peak(103), __peak(600)])
+
+    assert result.alignedPairs == [(4, 1), (5, 2), (6, 3)]
+    assert result.confidence == 300
+
+
+def test_returnsEmptyAlignment_belowMinScore():
+    reference = OpticalMap(1, length=300, positions=[100, 150, 200])
+    query = OpticalMap(2, length=101, positions=[0, 50, 100])
+
+    result = getSut(minScore=301).align(reference, query, __peak(100))
+
+    assert result.alignedPairs == []
+
+
+def test_returnsEmptyAlignment_withoutPeaks():
+    reference = OpticalMap(1, length=300, positions=[100, 150, 200])
+    query = OpticalMap(2, length=101, positions=[0, 50, 100])
+
+    result = getSut().align(reference, query, [])
+
+    assert result.alignedPairs == []
+
+
+def test_marksResultAsDegraded_whenDeadlineHasPassed():
+    reference = OpticalMap(1, length=300, positions=[100, 150, 200])
+    query = OpticalMap(2, length=101, positions=[0, 50, 100])
+
+    result = getSut().align(reference, query, [__peak(100), __peak(102)], deadline=Deadline(0))
+
+    assert result.degraded
+
+
+if __name__ == '__main__':
+    pytest.main(args=[__file__])
@@ -73,6 +73,24 @@ def test_chain_dropsOutlyingSegment():
     assert chainedSegments == [segments[0], segments[1]]
 
 
+@pytest.mark.parametrize("band, expectedChainLength", [(None, 2), (600, 2), (400, 1)])
+def test_chain_withBand(band, expectedChainLength):
+    segments = [
+        AlignmentSegmentBuilder()
+            .withPosition(ScoredAlignedPairBuilder().withReferencePosition(100).withQueryPosition(100).build())
+            .withPosition(ScoredAlignedPairBuilder().withReferencePosition(300).withQueryPosition(300).build())
+            .withScore(1200.)
+            .build(),
+        AlignmentSegmentBuilder()
+            .withPosition(ScoredAlignedPairBuilder().withReferencePosition(800).withQueryPosition(800).build())
+            .withPosition(ScoredAlignedPairBuilder().withReferencePosition(1000).withQueryPosition(1000).build())
+            .withScore(1200.)
+            .build()
+    ]
+    chainedSegments = SegmentChainer(SequentialityScorer(1., 0), band).chain(segments)
+    assert chainedSegments == segments[:expectedChainLength]
+
+
 def test_chain_preservesEmptySegments():
     segments = [
         AlignmentSegmentBuilder()
@@ -89,6 +89,16 @@ def test_multipleSegments():
     assert segments[1].allPeakPositions == positions
 
 
+def test_segmentBelowMinScore_isKeptForComparisonAfterBreak():
+    positions = __scoredPositions([2., -3., 1., -3., 3., 1.])
+    segments = AlignmentSegmentsFactory(4, 1).getSegments(positions, __peak())
+
+    assert len(segments) == 1
+    assert segments[0].segmentScore == 4.
+    assert segments[0].positions == positions[4:]
+    assert segments[0].allPeakPositions == positions
+
+
 def test_filterSegment():
     pairs = list(map(lambda pair: ScoredAlignedPairStub(pair[0], pair[1], 0, pair[2]),
                      [(1616, 1, 122.7), (1617, 2, 25.9), (1618, 3, 97.7), (1619, 4, 197.7), (1621, 5, 166.0),
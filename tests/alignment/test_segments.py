@@ -6,6 +6,7 @@ import pytest
 
 from src.alignment.segment_with_resolved_conflicts import AlignmentSegmentConflictResolver
 from src.alignment.segments import AlignmentSegment, EmptyAlignmentSegment
+from src.correlation.peak import Peak
 from tests.test_doubles.alignment_segment_stub import AlignedPairStub, AlignmentSegmentStub
 from tests.test_doubles.mock_segment_chainer import MockSegmentChainer
 
@@ -167,5 +168,47 @@ def test_subtract_noPositionsLeft_returnsEmptySegment():
     assert result == EmptyAlignmentSegment()
 
 
+peakPositions = AlignmentSegmentStub.createFromPairs(
+    [(1, 1, 100.), (None, 2, -50.), (2, 3, 100.), (3, 4, 100.), (4, 5, 100.)]).positions
+
+
+def __segmentOfPeakPositions(positionsRange: range):
+    return AlignmentSegment.create(peakPositions[positionsRange.start:positionsRange.stop], Peak.null, peakPositions,
+                                   positionsRange)
+
+
+def test_slice_keepsRangeOfPeakPositions():
+    segment = __segmentOfPeakPositions(range(0, 5))
+
+    sliced = segment.slice(AlignedPairStub(2, 3), AlignedPairStub(3, 4))
+
+    assert sliced.positionsRange == range(2, 4)
+    assert sliced.positions == peakPositions[2:4]
+
+
+@pytest.mark.parametrize("segmentRange, otherRange, expectedRange", [
+    pytest.param(range(0, 5), range(3, 5), range(0, 3), id="end"),
+    pytest.param(range(0, 5), range(0, 2), range(2, 5), id="start"),
+    pytest.param(range(2, 5), range(1, 4), range(4, 5), id="overlapping start"),
+    pytest.param(range(0, 3), range(3, 5), range(0, 3), id="disjoint"),
+    pytest.param(range(1, 4), range(0, 5), None, id="all"),
+])
+def test_subtract_rangeOfSamePeakPositions(segmentRange, otherRange, expectedRange):
+    segment = __segmentOfPeakPositions(segmentRange)
+    other = __segmentOfPeakPositions(otherRange)
+
+    result = segment - other
+
+    assert result.positionsRange == expectedRange
+    assert result.positions == [p for p in segment.positions if p not in other.positions]
+
+
+def test_subtract_rangeInTheMiddle_comparesPositions():
+    result = __segmentOfPeakPositions(range(0, 5)) - __segmentOfPeakPositions(range(2, 4))
+
+    assert result.positionsRange is None
+    assert result.positions == [peakPositions[0], peakPositions[1], peakPositions[4]]
+
+
 if __name__ == '__main__':
     pytest.main(args=[__file__])
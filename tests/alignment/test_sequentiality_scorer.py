@@ -2,7 +2,7 @@ import math
 
 import pytest
 
-from src.alignment.segment_chainer import SequentialityScorer
+from src.alignment.segment_chainer import SequentialityScorer, SegmentsEndpoints
 from tests.test_doubles.alignment_segment_builder import AlignmentSegmentBuilder
 from tests.test_doubles.scored_aligned_pair_builder import ScoredAlignedPairBuilder
 
@@ -42,3 +42,23 @@ def test_getScore(pos1, pos2, pos3, pos4, expectedScore):
     score = SequentialityScorer(1., 0).getScore(previousSegment, currentSegment)
 
     assert score == expectedScore
+
+
+@pytest.mark.parametrize("sequentialityScore", [0, 1])
+def test_getScores_equalsScoresOfSinglePairs(sequentialityScore):
+    scorer = SequentialityScorer(1.5, sequentialityScore)
+    previousSegments = [__segment((100, 100), end) for end in [
+        (500, 500), (501, 501), (600, 600), (600, 400), (700, 700), (300, 300), (500, 700), (700, 500), (500, 300),
+        (300, 500), (300, 700), (700, 300), (500, 200), (200, 500)]]
+    currentSegment = __segment((555.5, 512.25), (1000, 1000))
+
+    scores = scorer.getScores(SegmentsEndpoints.create(previousSegments), currentSegment)
+
+    assert scores.tolist() == [scorer.getScore(s, currentSegment) for s in previousSegments]
+
+
+def __segment(start, end):
+    return AlignmentSegmentBuilder() \
+        .withPosition(ScoredAlignedPairBuilder().withReferencePosition(start[0]).withQueryPosition(start[1]).build()) \
+        .withPosition(ScoredAlignedPairBuilder().withReferencePosition(end[0]).withQueryPosition(end[1]).build()) \
+        .build()
@@ -11,13 +11,13 @@ def test_trim():
     opticalMap = OpticalMap(2, 130, [20, 50, 100])
     trimmed = opticalMap.trim()
     assert trimmed.length == 81
-    assert trimmed.positions == [0, 30, 80]
+    assert trimmed.positions.tolist() == [0, 30, 80]
 
 
 def test_trim_empty():
     opticalMap = OpticalMap(2, 20, [])
     trimmed = opticalMap.trim()
-    assert trimmed.positions == []
+    assert trimmed.positions.tolist() == []
 
 
 def test_getPositionsWithSiteIds():
@@ -38,6 +38,28 @@ def test_getPositionsWithSiteIds_empty(reverse: bool):
     assert list(opticalMap.getPositionsWithSiteIds(reverse)) == []
 
 
+def test_getSiteIdsAndPositions_reverse_sharesCachedArrays():
+    opticalMap = OpticalMap(2, 101, [0, 10, 30, 100], shift=2)
+
+    siteIds, positions = opticalMap.getSiteIdsAndPositions(True)
+
+    assert siteIds.tolist() == [6, 5, 4, 3]
+    assert positions.tolist() == [0, 70, 90, 100]
+    assert opticalMap.getSiteIdsAndPositions(True)[1] is positions
+
+
+def test_positions_areReadOnly():
+    opticalMap = OpticalMap(2, 101, [0, 10, 30, 100])
+
+    with pytest.raises(ValueError):
+        opticalMap.positions[0] = 5
+
+
+def test_equality_comparesPositions():
+    assert OpticalMap(2, 101, [0, 10]) == OpticalMap(2, 101, np.array([0., 10.]))
+    assert OpticalMap(2, 101, [0, 10]) != OpticalMap(2, 101, [0, 11])
+
+
 def test_refineAlignment_correctPeakPosition():
     reference = OpticalMap(1, 1000, [20, 100, 110, 300, 310, 330, 400, 1000])
     query = OpticalMap(2, 100, [0, 10, 30, 100])
@@ -52,6 +74,42 @@ def test_refineAlignment_correctPeakPosition():
     assert refinedAlignment.maxPeak.position == 300
 
 
+def test_getInitialAlignment_withinReferenceWindow_returnsPeakRelativeToReferenceStart():
+    reference = OpticalMap(1, 1000, [20, 100, 110, 300, 310, 330, 400, 600, 610, 630, 700, 1000])
+    query = OpticalMap(2, 101, [0, 10, 30, 100])
+    generator = SequenceGenerator(2, 2)
+
+    initialAlignment = query.getInitialAlignment(reference, generator, 2, 5, referenceStart=500, referenceEnd=800)
+
+    assert initialAlignment.maxPeak.position == 600
+    assert initialAlignment.correlationStart == 500
+
+
+def test_getInitialAlignment_whenQueryIsLongerThanReferenceWindow_returnsEmptyResult():
+    reference = OpticalMap(1, 1000, [20, 100, 110, 300, 310, 330, 400, 1000])
+    query = OpticalMap(2, 101, [0, 10, 30, 100])
+
+    initialAlignment = query.getInitialAlignment(reference, SequenceGenerator(2, 2), 2, 5,
+                                                 referenceStart=250, referenceEnd=300)
+
+    assert len(initialAlignment.peaks) == 0
+
+
+def test_getInitialAlignment_reusesWholeReferenceSequence():
+    reference = OpticalMap(1, 1000, [20, 100, 110, 300, 310, 330, 400, 1000])
+    query = OpticalMap(2, 100, [0, 10, 30, 100])
+    generator = SequenceGenerator(2, 2)
+
+    first = query.getInitialAlignment(reference, generator, 2, 5)
+    second = query.getInitialAlignment(reference, generator, 2, 5, reverseStrand=True)
+
+    assert generator.referenceToSequence(reference) is generator.referenceToSequence(reference)
+    assert generator.referenceToSequence(reference).tolist() == reference.getSequence(generator).tolist()
+    assert generator.referenceToSequence(reference).dtype == np.int8
+    assert first.maxPeak.position == 300
+    assert len(second.correlation) == len(first.correlation)
+
+
 @pytest.mark.parametrize("positions,resolution,expected,start", [
     ([1, 3, 5], 1, [1, 3, 5], 0),
     ([1, 3, 5], 2, [2, 6, 10], 0),
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from src.correlation.optical_map import OpticalMap, InitialAlignment
+from src.correlation.peak import Peak
+from src.correlation.peak_candidates import PeakCandidates
+
+reference1 = OpticalMap(1, 10000, [0, 5000, 9999])
+reference2 = OpticalMap(2, 10000, [0, 5000, 9999])
+query = OpticalMap(10, 1001, [0, 200, 600, 1000])
+
+
+def __initialAlignment(reference: OpticalMap, reverseStrand: bool, *peakPositions: int):
+    return InitialAlignment(np.array([]), query, reference, [Peak(p, 1., score=p / 100) for p in peakPositions],
+                            reverseStrand, 0.)
+
+
+def test_create_keepsAllPeaks():
+    candidates = PeakCandidates.create(query, [__initialAlignment(reference1, False, 100, 2000),
+                                               __initialAlignment(reference2, True, 3000)])
+
+    assert len(candidates) == 3
+    assert candidates.referenceIds.tolist() == [1, 1, 2]
+    assert candidates.positions.tolist() == [100, 2000, 3000]
+    assert candidates.scores.tolist() == [1, 20, 30]
+    assert candidates.reverseStrands.tolist() == [False, False, True]
+
+
+def test_create_empty():
+    candidates = PeakCandidates.create(query, [])
+
+    assert len(candidates) == 0
+    assert candidates.getInitialAlignments(query, reference1, 1, 0) == []
+
+
+def test_getInitialAlignments_selectsPeaksOfReferenceWithinRange():
+    candidates = PeakCandidates.create(query, [__initialAlignment(reference1, False, 100, 2000, 4000),
+                                               __initialAlignment(reference2, False, 2000)])
+
+    initialAlignments = candidates.getInitialAlignments(query, reference1, 1, 0, 1000, 5000)
+
+    assert len(initialAlignments) == 1
+    assert initialAlignments[0].reference == reference1
+    assert [p.position for p in initialAlignments[0].peaks] == [2000, 4000]
+    assert [p.score for p in initialAlignments[0].peaks] == [20, 40]
+
+
+@pytest.mark.parametrize("reverseStrand, expectedStrands", [(None, [False, True]), (True, [True]), (False, [False])])
+def test_getInitialAlignments_selectsStrand(reverseStrand, expectedStrands):
+    candidates = PeakCandidates.create(query, [__initialAlignment(reference1, False, 100),
+                                               __initialAlignment(reference1, True, 200)])
+
+    initialAlignments = candidates.getInitialAlignments(query, reference1, 1, 0, reverseStrand=reverseStrand)
+
+    assert [a.reverseStrand for a in initialAlignments] == expectedStrands
+
+
+def test_getInitialAlignments_shiftsReverseStrandPeaksOfFragmentMissingQueryEnd():
+    candidates = PeakCandidates.create(query, [__initialAlignment(reference1, False, 100),
+                                               __initialAlignment(reference1, True, 200)])
+    fragment = OpticalMap(10, 1001, [0, 200, 600], shift=0)
+
+    forward, reverse = candidates.getInitialAlignments(fragment, reference1, 1, 0)
+
+    assert forward.query == fragment
+    assert forward.peaks[0].position == 100
+    assert reverse.peaks[0].position == 600
+
+
+if __name__ == '__main__':
+    pytest.main(args=[__file__])
@@ -0,0 +1,54 @@
+from unittest.mock import Mock
+
+import pytest
+
+from src.diagnostic.diagnostics import AlignmentPlotter, DiagnosticsWriter
+from src.execution.executors import ProcessExecutor
+from src.parsers.alignment_benchmark_reader import AlignmentBenchmarkIndex, AlignmentBenchmarkReader
+from src.parsers.simulation_data_as_xmap_reader import SimulationDataAsXmapReader
+from src.parsers.xmap_reader import XmapReader
+
+
+def test_getBenchmarkAlignment_queryWithoutBenchmarkAlignment_returnsNone():
+    benchmarkIndex: AlignmentBenchmarkIndex = Mock(spec=AlignmentBenchmarkIndex)
+    benchmarkIndex.get.return_value = []
+    plotter = AlignmentPlotter(Mock(spec=DiagnosticsWriter), benchmarkIndex)
+
+    assert plotter.getBenchmarkAlignment(__getMessage(1)) is None
+
+
+def test_getBenchmarkAlignment_inWorkerProcesses_findsBenchmarkAlignmentOfEachQuery(tmp_path):
+    path = tmp_path / "benchmark.xmap"
+    path.write_text(__getXmap([1, 2, 3, 4]))
+    reader = AlignmentBenchmarkReader(XmapReader(), Mock(spec=SimulationDataAsXmapReader))
+    with open(path) as file:
+        plotter = AlignmentPlotter(Mock(spec=DiagnosticsWriter), AlignmentBenchmarkIndex.read(reader, file))
+    executor = ProcessExecutor(2, True)
+
+    try:
+        queryIds = list(executor.imap(lambda queryId: plotter.getBenchmarkAlignment(__getMessage(queryId)).queryId,
+                                      [1, 2, 3, 4] * 3))
+    finally:
+        executor.close()
+
+    assert queryIds == [1, 2, 3, 4] * 3
+
+
+def __getMessage(queryId: int):
+    message = Mock()
+    message.query.moleculeId = queryId
+    return message
+
+
+def __getXmap(queryIds):
+    return "\n".join([
+        "# XMAP File Version:\t0.2",
+        "#h XmapEntryID\tQryContigID\tRefContigID\tQryStartPos\tQryEndPos\tRefStartPos\tRefEndPos\tOrientation\t"
+        "Confidence\tHitEnum\tQryLen\tRefLen\tLabelChannel\tAlignment",
+        "#f int\tint\tint\tfloat\tfloat\tfloat\tfloat\tstring\tfloat\tstring\tfloat\tfloat\tint\tstring",
+        *[f"{queryId}\t{queryId}\t1\t10.0\t20.0\t110.0\t120.0\t+\t10.0\t2M\t30.0\t1000.0\t1\t(1,1)(2,2)"
+          for queryId in queryIds]]) + "\n"
+
+
+if __name__ == '__main__':
+    pytest.main(args=[__file__])
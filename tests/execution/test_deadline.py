@@ -0,0 +1,29 @@
+import pytest
+
+from src.execution.deadline import Deadline
+
+
+def test_withoutBudget_neverPasses():
+    deadline = Deadline.start(None)
+
+    assert not deadline.passed()
+    assert deadline.map(lambda x: x + 1, [1, 2, 3]) == ([2, 3, 4], True)
+
+
+def test_beforeDeadline_mapsAllItems():
+    assert Deadline.start(60).map(lambda x: x + 1, [1, 2, 3]) == ([2, 3, 4], True)
+
+
+def test_afterDeadline_mapsFirstItemOnly():
+    deadline = Deadline(0.)
+
+    assert deadline.passed()
+    assert deadline.map(lambda x: x + 1, [1, 2, 3]) == ([2], False)
+
+
+def test_afterDeadline_empty():
+    assert Deadline(0.).map(lambda x: x, []) == ([], True)
+
+
+if __name__ == '__main__':
+    pytest.main(args=[__file__])
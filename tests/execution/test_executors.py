@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from src.execution.executors import ProcessExecutor, ThreadExecutor, SerialExecutor
+
+
+@pytest.mark.parametrize("executorType", [ProcessExecutor, ThreadExecutor, SerialExecutor])
+def test_imap_keepsOrderOfItems(executorType):
+    executor = executorType(2, True)
+
+    assert list(executor.imap(lambda x: x * x, [3, 1, 2])) == [9, 1, 4]
+
+
+@pytest.mark.parametrize("executorType", [ProcessExecutor, ThreadExecutor, SerialExecutor])
+def test_imap_empty(executorType):
+    executor = executorType(2, True)
+
+    assert list(executor.imap(lambda x: x, [])) == []
+
+
+def test_processExecutor_reusesWorkersUntilClosed():
+    executor = ProcessExecutor(1, True)
+    getPid = lambda _: os.getpid()
+
+    try:
+        firstPids = list(executor.imap(getPid, [1, 2]))
+        secondPids = list(executor.imap(getPid, [1, 2]))
+    finally:
+        executor.close()
+
+    assert len(set(firstPids + secondPids)) == 1
+    assert firstPids[0] != os.getpid()
+
+
+def test_processExecutor_afterClose_startsNewWorkers():
+    executor = ProcessExecutor(1, True)
+    getPid = lambda _: os.getpid()
+
+    try:
+        firstPids = list(executor.imap(getPid, [1]))
+        executor.close()
+        secondPids = list(executor.imap(getPid, [1]))
+    finally:
+        executor.close()
+
+    assert firstPids != secondPids
+
+
+if __name__ == '__main__':
+    pytest.main(args=[__file__])
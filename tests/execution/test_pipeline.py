@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src.execution.executors import ProcessExecutor
+from src.execution.pipeline import Pipeline, PipelineStage
+
+
+def __slowForFirstItems(x: int):
+    time.sleep(0.01 if x < 3 else 0)
+    return x
+
+
+def test_imap_passesItemsThroughStagesInOrder():
+    pipeline = Pipeline([PipelineStage("add", lambda x: x + 1, 3),
+                         PipelineStage("slow", __slowForFirstItems, 2),
+                         PipelineStage("double", lambda x: 2 * x)], queueSize=1, disableProgressBar=True)
+
+    assert list(pipeline.imap(range(10))) == [2 * (x + 1) for x in range(10)]
+    assert [s.items for s in pipeline.statistics] == [10, 10, 10]
+
+
+def test_imap_runsStageInProcess():
+    pipeline = Pipeline([PipelineStage("add", lambda x: x + 1),
+                         PipelineStage("square", lambda x: x * x, 2, inProcess=True)], disableProgressBar=True)
+
+    assert list(pipeline.imap([1, 2, 3])) == [4, 9, 16]
+
+
+def test_imap_reusesPoolOfProcessExecutor():
+    executor = ProcessExecutor(1, True)
+    pipeline = Pipeline([PipelineStage("pid", __getPid, inProcess=True)], disableProgressBar=True,
+                        processExecutor=executor)
+
+    try:
+        firstPids = list(pipeline.imap([1, 2]))
+        secondPids = list(pipeline.imap([1, 2]))
+    finally:
+        executor.close()
+
+    assert len(set(firstPids + secondPids)) == 1
+    assert firstPids[0] != os.getpid()
+
+
+def __getPid(_):
+    return os.getpid()
+
+
+def test_imap_empty():
+    pipeline = Pipeline([PipelineStage("add", lambda x: x + 1)], disableProgressBar=True)
+
+    assert list(pipeline.imap([])) == []
+
+
+def test_imap_raisesExceptionOfStage():
+    pipeline = Pipeline([PipelineStage("divide", lambda x: 1 / x, 2),
+                         PipelineStage("add", lambda x: x + 1)], disableProgressBar=True)
+
+    with pytest.raises(ZeroDivisionError):
+        list(pipeline.imap([1, 0, 2]))
+
+
+@pytest.mark.parametrize("inProcess", [False, True])
+def test_imap_stageRaises_stopsAllStages(inProcess):
+    threadsCount = threading.active_count()
+    pipeline = Pipeline([PipelineStage("divide", lambda x: 1 / x, 2, inProcess),
+                         PipelineStage("add", lambda x: x + 1)], queueSize=1, disableProgressBar=True)
+
+    with pytest.raises(ZeroDivisionError):
+        list(pipeline.imap(range(100)))
+
+    assert threading.active_count() == threadsCount
+
+
+def test_imap_closedEarly_stopsAllStages():
+    threadsCount = threading.active_count()
+    pipeline = Pipeline([PipelineStage("add", lambda x: x + 1, 2),
+                         PipelineStage("double", lambda x: 2 * x)], queueSize=1, disableProgressBar=True)
+
+    results = pipeline.imap(range(100))
+    assert next(results) == 2
+    results.close()
+
+    assert threading.active_count() == threadsCount
+
+
+if __name__ == '__main__':
+    pytest.main(args=[__file__])
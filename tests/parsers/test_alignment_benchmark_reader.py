@@ -0,0 +1,37 @@
+from unittest.mock import Mock
+
+import pytest
+
+from src.diagnostic.benchmark_alignment import BenchmarkAlignment
+from src.parsers.alignment_benchmark_reader import AlignmentBenchmarkReader, AlignmentBenchmarkIndex
+
+
+def test_get_groupsAlignmentsByQueryId():
+    first, second, third = __getAlignment(1), __getAlignment(2), __getAlignment(1)
+    index = AlignmentBenchmarkIndex([first, second, third])
+
+    assert index.get(1) == [first, third]
+    assert index.get(2) == [second]
+    assert index.get(3) == []
+
+
+def test_read_readsFileOnCreation():
+    alignment = __getAlignment(1)
+    reader: AlignmentBenchmarkReader = Mock(spec=AlignmentBenchmarkReader)
+    reader.read.return_value = [alignment]
+    file = Mock()
+
+    index = AlignmentBenchmarkIndex.read(reader, file, [1, 2])
+
+    reader.read.assert_called_once_with(file, [1, 2])
+    assert index.get(1) == [alignment]
+
+
+def __getAlignment(queryId: int):
+    alignment: BenchmarkAlignment = Mock(spec=BenchmarkAlignment)
+    alignment.queryId = queryId
+    return alignment
+
+
+if __name__ == '__main__':
+    pytest.main(args=[__file__])
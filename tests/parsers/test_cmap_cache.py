@@ -0,0 +1,70 @@
+import os
+from unittest.mock import Mock
+
+import pytest
+
+from src.parsers.bionano_file_reader import BionanoFileReader
+from src.parsers.cmap_cache import CmapCache
+from src.parsers.cmap_reader import CmapReader
+
+cmap = """# CMAP File Version:\t0.1
+#h CMapId\tContigLength\tNumSites\tSiteID\tLabelChannel\tPosition\tStdDev\tCoverage\tOccurrence
+1\t300.0\t2\t1\t1\t100.0\t0.0\t1\t1
+1\t300.0\t2\t2\t1\t200.5\t0.0\t1\t1
+1\t300.0\t2\t3\t0\t300.0\t0.0\t1\t0
+2\t500.0\t1\t1\t1\t50.0\t0.0\t1\t1
+2\t500.0\t1\t2\t0\t500.0\t0.0\t1\t0
+"""
+
+
+@pytest.fixture
+def cmapPath(tmp_path):
+    path = str(tmp_path / "maps.cmap")
+    with open(path, "w") as file:
+        file.write(cmap)
+    return path
+
+
+def test_readQueries_secondRead_loadsMapsFromCache(cmapPath):
+    with open(cmapPath) as file:
+        parsed = CmapReader(useCache=True).readQueries(file)
+    failingReader: BionanoFileReader = Mock(spec=BionanoFileReader)
+    failingReader.readFile.side_effect = AssertionError("file should not be parsed")
+
+    with open(cmapPath) as file:
+        cached = CmapReader(failingReader, useCache=True).readQueries(file)
+
+    assert cached == parsed
+    assert [(m.moleculeId, m.length, m.positions.tolist()) for m in cached] == [(1, 300, [100., 200.5]),
+                                                                                 (2, 500, [50.])]
+
+
+def test_readQueries_fromCache_selectsMoleculeIds(cmapPath):
+    with open(cmapPath) as file:
+        CmapReader(useCache=True).readQueries(file)
+
+    with open(cmapPath) as file:
+        cached = CmapReader(useCache=True).readQueries(file, [2])
+
+    assert [m.moleculeId for m in cached] == [2]
+
+
+def test_load_afterCmapFileChanged_returnsNone(cmapPath):
+    with open(cmapPath) as file:
+        CmapCache(cmapPath).save(CmapReader().readQueries(file))
+
+    with open(cmapPath, "a") as file:
+        file.write("3\t100.0\t1\t1\t1\t10.0\t0.0\t1\t1\n3\t100.0\t1\t2\t0\t100.0\t0.0\t1\t0\n")
+
+    assert CmapCache(cmapPath).load() is None
+
+
+def test_readQueries_withoutCache_writesNoCache(cmapPath):
+    with open(cmapPath) as file:
+        CmapReader().readQueries(file)
+
+    assert not os.path.exists(CmapCache(cmapPath).directory)
+
+
+if __name__ == '__main__':
+    pytest.main(args=[__file__])
@@ -27,7 +27,7 @@ def test_parsesMap(data):
     opticalMap = opticalMaps[0]
     assert opticalMap.moleculeId == 1
     assert opticalMap.length == 300
-    assert opticalMap.positions == [100, 200]
+    assert opticalMap.positions.tolist() == [100, 200]
 
 
 def test_parsesMap_emptyMap():
@@ -41,6 +41,31 @@ def test_parsesMap_emptyMap():
     assert len(opticalMaps) == 0
 
 
+def test_parsesMaps_sortedByIdAndPosition():
+    data = {
+        "CMapId": [2, 2, 1, 2, 1, 1],
+        "Position": [250, 150, 100, 400, 300, 50],
+        "LabelChannel": [1, 1, 1, 0, 0, 1]}
+    cmapReader = __getSut(data)
+
+    opticalMaps = cmapReader.readQueries(Mock())
+
+    assert [m.moleculeId for m in opticalMaps] == [1, 2]
+    assert [m.length for m in opticalMaps] == [300, 400]
+    assert [m.positions.tolist() for m in opticalMaps] == [[50, 100], [150, 250]]
+
+
+def test_parsesMap_withoutEndMarker_raises():
+    data = {
+        "CMapId": [1, 1],
+        "Position": [100, 200],
+        "LabelChannel": [1, 1]}
+    cmapReader = __getSut(data)
+
+    with pytest.raises(ValueError):
+        cmapReader.readQueries(Mock())
+
+
 def __getSut(data: Dict[str, List[int]]):
     fileReaderMock: BionanoFileReader = Mock(spec=BionanoFileReader)
     fileReaderMock.readFile = lambda _, __: DataFrame(data=data)
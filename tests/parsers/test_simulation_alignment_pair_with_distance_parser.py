@@ -37,5 +37,19 @@ def test_createsAlignedPairsWithDistance_fromSimulationData_empty():
     assert len(pairs) == 0
 
 
+def test_parseAll_equalsParseOfEachRow():
+    reference = OpticalMap(1, 100, [1000, 1100, 1200, 1600])
+    query = OpticalMap(10, 100, [90, 220, 300])
+    otherQuery = OpticalMap(11, 100, [100, 200, 300])
+    sut = SimulationAlignmentPairWithDistanceParser([reference], [query, otherQuery])
+    rows = [("1:2;1:1;1:0", 10, 1, True), ("", 11, 1, False), ("1:0;FP;1:1,1:2,FP", 11, 1, False)]
+
+    pairs = sut.parseAll(*zip(*rows))
+
+    assert pairs == [sut.parse(*row) for row in rows]
+    assert [[p.distance for p in rowPairs] for rowPairs in pairs] == [[p.distance for p in sut.parse(*row)]
+                                                                      for row in rows]
+
+
 if __name__ == '__main__':
     pytest.main(args=[__file__])
@@ -0,0 +1,48 @@
+import pytest
+
+from src.correlation.optical_map import OpticalMap
+from src.diagnostic.benchmark_alignment import BenchmarkAlignedPairWithDistance, BenchmarkAlignmentPosition
+from src.parsers.xmap_alignment_pair_parser import XmapAlignmentPairWithDistanceParser, XmapAlignmentPairParser
+
+
+def test_parse_createsAlignedPairsWithDistance():
+    reference = OpticalMap(1, 3000, [1000, 1300, 1320, 2000])
+    query = OpticalMap(10, 600, [100, 200, 320, 500])
+    sut = XmapAlignmentPairWithDistanceParser([reference], [query])
+
+    pairs = sut.parse("(1,1)(2,3)(4,4)", 10, 1, False)
+
+    assert [(p.reference, p.query, p.distance) for p in pairs] == [
+        (BenchmarkAlignmentPosition(1, 1000), BenchmarkAlignmentPosition(1, 100), 0),
+        (BenchmarkAlignmentPosition(2, 1300), BenchmarkAlignmentPosition(3, 320), -80),
+        (BenchmarkAlignmentPosition(4, 2000), BenchmarkAlignmentPosition(4, 500), -600)]
+
+
+def test_parseAll_findsMapsOfEachRowById():
+    reference = OpticalMap(1, 3000, [1000, 1300, 1320, 2000])
+    queries = [OpticalMap(10, 600, [100, 200, 320, 500]), OpticalMap(11, 600, [0, 250, 400])]
+    sut = XmapAlignmentPairWithDistanceParser([reference], queries)
+    rows = [("(1,1)(2,3)(4,4)", 10, 1, False), ("(2,3)(3,2)", 11, 1, True)]
+
+    pairs = sut.parseAll(*zip(*rows))
+
+    assert pairs == [sut.parse(*row) for row in rows]
+    assert pairs[1] == [
+        BenchmarkAlignedPairWithDistance(BenchmarkAlignmentPosition(2, 1300), BenchmarkAlignmentPosition(3, 400), 0),
+        BenchmarkAlignedPairWithDistance(BenchmarkAlignmentPosition(3, 1320), BenchmarkAlignmentPosition(2, 250), 0)]
+    assert [p.distance for p in pairs[1]] == [0, 130]
+
+
+def test_parseAll_withoutDistance_equalsParseOfEachRow():
+    sut = XmapAlignmentPairParser()
+    rows = [("(1,1)(2,3)(4,4)", 10, 1, False), ("(12,3)", 11, 1, True)]
+
+    assert sut.parseAll(*zip(*rows)) == [sut.parse(*row) for row in rows]
+
+
+def test_parseAll_withoutDistance_emptyInput_returnsNoRows():
+    assert XmapAlignmentPairParser().parseAll([], [], [], []) == []
+
+
+if __name__ == '__main__':
+    pytest.main(args=[__file__])
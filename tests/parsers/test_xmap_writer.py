@@ -0,0 +1,89 @@
+import gzip
+from unittest.mock import Mock
+
+import pytest
+
+from src.alignment.alignment_results import AlignmentResults, AlignmentResultRow
+from src.args import Args
+from src.parsers.xmap_writer import XmapWriter
+
+headerLinesCount = 7
+
+
+@pytest.fixture
+def cmapPath(tmp_path):
+    path = str(tmp_path / "maps.cmap")
+    with open(path, "w") as file:
+        file.write("")
+    return path
+
+
+def test_write_formatsRows(tmp_path, cmapPath):
+    args = __getArgs(cmapPath, str(tmp_path / "out.xmap"))
+
+    lines = __write(args, [__getRow(), __getRow(queryId=3, reverseStrand=True, cigarString='1M"1I')])
+
+    assert lines[headerLinesCount - 2].split("\t") == [
+        "#h", "XmapEntryID", "QryContigID", "RefContigID", "QryStartPos", "QryEndPos", "RefStartPos", "RefEndPos",
+        "Orientation", "Confidence", "HitEnum", "QryLen", "RefLen", "AlignedRest", "LabelChannel", "Alignment"]
+    assert lines[headerLinesCount:] == [
+        "1\t2\t1\t10.0\t20.0\t110.0\t120.5\t+\t12.35\t2M\t100.0\t1000.0\tFalse\t1\t(1,1)(2,2)",
+        '2\t3\t1\t10.0\t20.0\t110.0\t120.5\t-\t12.35\t"1M""1I"\t100.0\t1000.0\tFalse\t1\t(1,1)(2,2)']
+
+
+def test_write_withQueryTimeBudget_addsDegradedColumn(tmp_path, cmapPath):
+    args = __getArgs(cmapPath, str(tmp_path / "out.xmap"), "-tb", "1")
+
+    lines = __write(args, [__getRow(degraded=True)])
+
+    assert "Degraded" in lines[headerLinesCount - 2].split("\t")
+    assert lines[headerLinesCount] == \
+           "1\t2\t1\t10.0\t20.0\t110.0\t120.5\t+\t12.35\t2M\t100.0\t1000.0\tFalse\tTrue\t1\t(1,1)(2,2)"
+
+
+def test_write_toGzFile_compressesOutput(tmp_path, cmapPath):
+    plainLines = __write(__getArgs(cmapPath, str(tmp_path / "out.xmap")), [__getRow()])
+    compressedArgs = __getArgs(cmapPath, str(tmp_path / "out.xmap.gz"))
+
+    XmapWriter().write(compressedArgs.outputFile, AlignmentResults(cmapPath, cmapPath, [__getRow()]), compressedArgs)
+    compressedArgs.outputFile.close()
+
+    with gzip.open(compressedArgs.outputFile.name, "rt") as file:
+        assert file.read().splitlines()[2:] == plainLines[2:]
+
+
+def __write(args: Args, rows):
+    XmapWriter().write(args.outputFile, AlignmentResults(args.referenceFile.name, args.queryFile.name, rows), args)
+    args.outputFile.close()
+    with open(args.outputFile.name) as file:
+        return file.read().splitlines()
+
+
+def __getArgs(cmapPath: str, outputPath: str, *args: str):
+    parsed = Args.parse(["-r", cmapPath, "-q", cmapPath, "-o", outputPath, *args])
+    parsed.referenceFile.close()
+    parsed.queryFile.close()
+    return parsed
+
+
+def __getRow(queryId=2, reverseStrand=False, cigarString="2M", degraded=False):
+    row: AlignmentResultRow = Mock(spec=AlignmentResultRow)
+    row.queryId = queryId
+    row.referenceId = 1
+    row.queryStartPosition = 10
+    row.queryEndPosition = 20
+    row.referenceStartPosition = 110
+    row.referenceEndPosition = 120.5
+    row.orientation = "-" if reverseStrand else "+"
+    row.confidence = 12.346
+    row.cigarString = cigarString
+    row.queryLength = 100
+    row.referenceLength = 1000
+    row.alignedRest = False
+    row.degraded = degraded
+    row.alignmentString = "(1,1)(2,2)"
+    return row
+
+
+if __name__ == '__main__':
+    pytest.main(args=[__file__])
@@ -0,0 +1,68 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from src.args import Args
+from src.correlation.optical_map import OpticalMap
+from src.extensions.dispatcher import Dispatcher
+from src.parsers.xmap_reader import XmapReader
+from src.workflow_coordinator_factory import WorkflowCoordinatorFactory
+
+
+@pytest.fixture
+def cmapPath(tmp_path):
+    path = str(tmp_path / "maps.cmap")
+    with open(path, "w") as file:
+        file.write("")
+    return path
+
+
+def test_execute_joinedOutput_localSecondPassJoinsFragmentWhichAlignsBetterElsewhere(tmp_path, cmapPath):
+    random = np.random.default_rng(0)
+    firstPart, fragment = __getSites(random, 150000), __getSites(random, 100000)
+    shiftedFragment = [p + shift for p, shift in zip(fragment, random.choice([-600, 600], len(fragment)))]
+    del shiftedFragment[len(shiftedFragment) // 2]
+    reference = __concatenate(1, [(__getSites(random, 100000), 100000), (firstPart, 150000),
+                                  (__getSites(random, 40000), 40000), (shiftedFragment, 100000),
+                                  (__getSites(random, 800000), 800000), (fragment, 100000),
+                                  (__getSites(random, 50000), 50000)])
+    query = __concatenate(2, [(firstPart, 150000), (fragment, 100000)])
+
+    fullRows = __execute(cmapPath, str(tmp_path / "full.xmap"), "full", reference, query)
+    localRows = __execute(cmapPath, str(tmp_path / "local.xmap"), "local", reference, query)
+
+    assert fullRows == []
+    with open(tmp_path / "full_1.xmap") as file:
+        fullSeparateRows = XmapReader().readAlignments(file)
+    assert sorted(1190000 <= r.referenceStartPosition < 1290000 for r in fullSeparateRows) == [False, True]
+    assert len(localRows) == 1
+    assert 100000 <= localRows[0].referenceStartPosition < 250000
+    assert 290000 <= localRows[0].referenceEndPosition < 390000
+
+
+def __execute(cmapPath: str, outputPath: str, secondPassMode: str, reference: OpticalMap, query: OpticalMap):
+    args = Args.parse(["-r", cmapPath, "-q", cmapPath, "-o", outputPath, "-oM", "joined", "-sm", secondPassMode,
+                       "-e", "serial", "-pb"])
+    args.referenceFile.close()
+    args.queryFile.close()
+    rows = WorkflowCoordinatorFactory(args, Dispatcher(), XmapReader()).create().execute([reference], [query])
+    args.outputFile.close()
+    return rows
+
+
+def __getSites(random: np.random.Generator, length: int) -> List[float]:
+    positions = np.cumsum(random.uniform(5000, 15000, length // 5000))
+    return positions[positions < length].round().tolist()
+
+
+def __concatenate(moleculeId: int, parts: List[tuple]):
+    positions, length = [], 0
+    for sites, partLength in parts:
+        positions += [p + length for p in sites]
+        length += partLength
+    return OpticalMap(moleculeId, length, positions)
+
+
+if __name__ == '__main__':
+    pytest.main(args=[__file__])